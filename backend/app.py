@@ -1,10 +1,18 @@
+import json
 import logging
-from flask import Flask, request, jsonify
+import time
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-from scrapers.gem_scraper import GemBidScraper
-from utils.driver_setup import get_webdriver
+import os
+from scrapers.runner import parse_scrape_request, run_scrape, scrape_events
+from utils.admission import AdmissionRejected
+from utils.driver_pool import DriverPoolExhausted
+from utils.jobs import JobManager, JobQueueFull
+from utils.result_cache import get_result_cache
+from utils.bid_store import get_bid_store
+from utils.export import ExportUnavailable, render_export
+from utils.metrics import HTTP_REQUEST_SECONDS, REGISTRY
 from datetime import datetime, timedelta
-import pandas as pd
 from pyngrok import ngrok
 
 app = Flask(__name__)
@@ -12,6 +20,14 @@ app = Flask(__name__)
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Background scrape jobs; workers are only started when the first job is queued.
+jobs = JobManager(
+    max_workers=int(os.environ.get("SCRAPE_JOB_WORKERS", 2)),
+    max_queued=int(os.environ.get("SCRAPE_JOB_MAX_QUEUED", 20)),
+    ttl=int(os.environ.get("SCRAPE_JOB_TTL", 3600)),
+    logger=app.logger,
+)
+
 @app.route('/', methods=['GET'])
 def index():
     """Root endpoint that provides basic API information."""
@@ -21,7 +37,11 @@ def index():
         "status": "operational",
         "endpoints": {
             "health_check": "/health (GET)",
-            "scrape": "/scrape (POST)"
+            "scrape": "/scrape (POST; add \"stream\": true for NDJSON, \"enrich\": true for bid document details, \"resumeToken\" to continue an incomplete scrape)",
+            "jobs": "/jobs (POST), /jobs/<id> (GET, DELETE)",
+            "bids": "/bids (GET), /bids/export (GET)",
+            "cache_stats": "/cache/stats (GET)",
+            "metrics": "/metrics (GET, Prometheus text format)"
         },
         "documentation": "https://github.com/NikhilSagili/TenderScraper"
     }), 200
@@ -33,11 +53,34 @@ CORS(app, resources={
             "https://nikhilsagili.github.io",  # GitHub Pages
             "http://localhost:3000"            # Local development
         ],
-        "methods": ["GET", "POST", "OPTIONS"],
-        "allow_headers": ["Content-Type"]
+        "methods": ["GET", "POST", "DELETE", "OPTIONS"],
+        "allow_headers": ["Content-Type"],
+        "expose_headers": ["Retry-After"]
     }
 })
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def observe_request(response):
+    # Streamed responses are timed up to their first byte.
+    started = g.pop('request_started', None)
+    if started is not None:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            endpoint=request.url_rule.rule if request.url_rule else "unmatched",
+            status=response.status_code,
+        )
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for Render to monitor the service."""
@@ -56,107 +99,207 @@ def health_check():
             "timestamp": datetime.utcnow().isoformat()
         }), 500
 
-def validate_date(date_str):
-    """Validate and parse date string."""
-    try:
-        return datetime.strptime(date_str, '%Y-%m-%d')
-    except (ValueError, TypeError):
-        return None
-
 @app.route('/scrape', methods=['POST'])
 def scrape():
     """API endpoint to trigger the scraper."""
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"error": "No input data provided"}), 400
-
-        target_url = data.get('url')
-        start_date_str = data.get('startDate')
-        end_date_str = data.get('endDate')
-
-        # Input validation
-        if not target_url:
-            return jsonify({"error": "URL is required"}), 400
-            
-        start_date = validate_date(start_date_str)
-        end_date = validate_date(end_date_str)
-        
-        if not start_date or not end_date:
-            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
-            
-        if start_date > end_date:
-            return jsonify({"error": "Start date cannot be after end date"}), 400
-            
-        # Add rate limiting check if needed
-        # if is_rate_limited():
-        #     return jsonify({"error": "Too many requests. Please try again later."}), 429
-            
+        params = parse_scrape_request(request.get_json())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         app.logger.error(f"Error in input validation: {str(e)}")
-        return jsonify({"error": f"Invalid request: {str(e)}"}), 400 
+        return jsonify({"error": f"Invalid request: {str(e)}"}), 400
 
-    if not target_url or not start_date_str or not end_date_str:
-        return jsonify({"error": "URL, start date, and end date are required"}), 400
+    if params["stream"] or request.accept_mimetypes.best == "application/x-ndjson":
+        try:
+            # Admission happens before the response starts, so a rejection can still be a 429.
+            events = scrape_events(params, app.logger)
+        except AdmissionRejected as e:
+            return _admission_rejected(e)
+        except ValueError as e:
+            # The resume token expired after the request was validated.
+            return jsonify({"error": str(e)}), 400
+        return Response(_stream_scrape(events), mimetype="application/x-ndjson",
+                        headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"})
 
     try:
-        # Convert string dates from frontend to datetime objects
-        start_date_obj = datetime.strptime(start_date_str, '%Y-%m-%d')
-        # Set end_date to the end of the day to include all bids on that day
-        end_date_obj = datetime.strptime(end_date_str, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
-    except ValueError:
-        return jsonify({"error": "Invalid date format. Please use YYYY-MM-DD"}), 400
+        app.logger.info(f"Initializing {params['engine']} scraper...")
+        bids, report = run_scrape(params, app.logger)
+        app.logger.info(f"Scraping completed. Found {len(bids)} bids")
 
-    driver = None
-    try:
-        app.logger.info("Initializing webdriver...")
-        driver = get_webdriver()
-        app.logger.info("Webdriver initialized successfully")
-        
-        app.logger.info("Initializing scraper...")
-        scraper = GemBidScraper(driver, app.logger)
-        app.logger.info("Scraper initialized successfully")
-        
-        try:
-            app.logger.info("Loading page...")
-            scraper.load_page()
-            app.logger.info("Page loaded successfully")
-            
-            app.logger.info("Applying filters and searching...")
-            state = data.get("state")  # Get state from request payload
-            app.logger.info(f"Received state filter: {state}")
-            scraper.apply_filters_and_search(state=state)
-            app.logger.info("Filters applied successfully")
-            
-            app.logger.info(f"Starting to scrape bids from {start_date_str} to {end_date_str}...")
-            bids_df = scraper.scrape_bids(start_date=start_date_obj, end_date=end_date_obj)
-            app.logger.info(f"Scraping completed. Found {len(bids_df)} bids")
-            
-            if bids_df.empty:
-                app.logger.info("No bids found for the given criteria")
-                return jsonify({"message": "No bids found for the given criteria", "data": []}), 200
-
-            # Convert DataFrame to list of dicts for JSON serialization
-            app.logger.info("Converting results to JSON...")
-            result = bids_df.to_dict(orient="records")
-            return jsonify({"message": "Success", "data": result}), 200
-            
-        except Exception as scrape_error:
-            app.logger.error(f"Error during scraping: {str(scrape_error)}", exc_info=True)
+        if report.get("incomplete"):
+            # The portal kept failing; hand back what was collected and how to continue.
             return jsonify({
-                "error": "Scraping failed",
-                "details": str(scrape_error)
-            }), 500
-            
+                "message": "Partial results: the GeM portal kept failing midway",
+                "incomplete": True,
+                "resumeToken": report.get("resume_token"),
+                "data": [bid.to_dict() for bid in bids],
+                "report": report,
+            }), 200
+
+        if not bids:
+            app.logger.info("No bids found for the given criteria")
+            return jsonify({"message": "No bids found for the given criteria", "data": [], "report": report}), 200
+
+        result = [bid.to_dict() for bid in bids]
+        return jsonify({"message": "Success", "data": result, "report": report}), 200
+
+    except AdmissionRejected as e:
+        return _admission_rejected(e)
+    except DriverPoolExhausted as e:
+        app.logger.error(f"Webdriver pool exhausted: {str(e)}")
+        return jsonify({
+            "error": "All scraper browsers are busy. Please try again later.",
+            "details": str(e)
+        }), 503
     except Exception as e:
-        app.logger.error(f"Error initializing scraper: {str(e)}", exc_info=True)
+        app.logger.error(f"Error during scraping: {str(e)}", exc_info=True)
         return jsonify({
-            "error": "Failed to initialize scraper",
+            "error": "Scraping failed",
             "details": str(e)
         }), 500
-    finally:
-        if driver:
-            driver.quit()
+
+def _query_date(name, end_of_day=False):
+    """Parses an optional YYYY-MM-DD query parameter."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"Invalid {name}. Use YYYY-MM-DD")
+    return parsed.replace(hour=23, minute=59, second=59) if end_of_day else parsed
+
+@app.route('/bids', methods=['GET'])
+def list_bids():
+    """Serves previously scraped bids from the local store without launching a browser.
+
+    Filters: state, department (prefix), startFrom/startTo, endFrom/endTo
+    (YYYY-MM-DD), q (text search over items and department). Results are
+    latest first; pass ``cursor`` from ``nextCursor`` to get the next page.
+    """
+    try:
+        bids, next_cursor = get_bid_store().query(
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', default=50, type=int),
+            **_bid_filters()
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"data": bids, "count": len(bids), "nextCursor": next_cursor}), 200
+
+@app.route('/bids/export', methods=['GET'])
+def export_bids():
+    """Downloads every stored bid matching the ``/bids`` filters as normalized columns.
+
+    ``format`` is csv (default), parquet or arrow; dates are real timestamps
+    and quantity an integer column.
+    """
+    try:
+        columns = get_bid_store().export(**_bid_filters())
+        body, mimetype, extension = render_export(columns, request.args.get('format', 'csv'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except ExportUnavailable as e:
+        return jsonify({"error": str(e)}), 501
+    return Response(body, mimetype=mimetype,
+                    headers={"Content-Disposition": f"attachment; filename=bids.{extension}"})
+
+def _bid_filters():
+    """Store filters shared by ``/bids`` and ``/bids/export``."""
+    return {
+        "state": request.args.get('state'),
+        "department": request.args.get('department'),
+        "start_from": _query_date('startFrom'),
+        "start_to": _query_date('startTo', end_of_day=True),
+        "end_from": _query_date('endFrom'),
+        "end_to": _query_date('endTo', end_of_day=True),
+        "text": request.args.get('q'),
+    }
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss statistics of the per-day result cache."""
+    return jsonify(get_result_cache(app.logger).stats()), 200
+
+def _admission_rejected(e):
+    response = jsonify({"error": "All scraper browsers are busy. Please try again later.", "details": str(e),
+                        "retryAfter": e.retry_after})
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response, 429
+
+def _stream_scrape(events):
+    """Yields the scrape as NDJSON, one chunk per completed page.
+
+    Each bid is a ``{"type": "bid"}`` line, followed by a ``progress`` line per
+    page; the stream ends with a ``done`` line carrying the run report (flagged
+    ``incomplete``, with a ``resumeToken``, when the portal kept failing), or an
+    ``error`` line if the scrape fails midway.
+    """
+    count = 0
+    try:
+        for event, *payload in events:
+            if event == "page":
+                page_num, page_bids = payload
+                count += len(page_bids)
+                lines = [json.dumps({"type": "bid", "page": page_num, "data": bid.to_dict()}) for bid in page_bids]
+                lines.append(json.dumps({"type": "progress", "page": page_num, "bids": count}))
+                yield "\n".join(lines) + "\n"
+            else:
+                report = payload[0]
+                if report.get("incomplete"):
+                    message = "Partial results: the GeM portal kept failing midway"
+                else:
+                    message = "Success" if count else "No bids found for the given criteria"
+                yield json.dumps({"type": "done", "message": message, "count": count, "incomplete": bool(report.get("incomplete")),
+                                  "resumeToken": report.get("resume_token"), "report": report}) + "\n"
+    except DriverPoolExhausted as e:
+        app.logger.error(f"Webdriver pool exhausted: {str(e)}")
+        yield json.dumps({"type": "error", "error": "All scraper browsers are busy. Please try again later.", "details": str(e)}) + "\n"
+    except Exception as e:
+        app.logger.error(f"Error during streaming scrape: {str(e)}", exc_info=True)
+        yield json.dumps({"type": "error", "error": "Scraping failed", "details": str(e)}) + "\n"
+
+def _run_scrape_job(job):
+    """Worker body for a scrape job: streams page progress into the job."""
+    _, report = run_scrape(job.params, app.logger, on_page=job.add_page, should_stop=job.should_stop, background=True)
+    return report
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queues a scrape and returns its job id immediately."""
+    try:
+        params = parse_scrape_request(request.get_json())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Invalid request: {str(e)}"}), 400
+
+    try:
+        job = jobs.submit(params, _run_scrape_job)
+    except JobQueueFull as e:
+        return jsonify({"error": "Too many scrape jobs are queued. Please try again later.", "details": str(e)}), 429
+    return jsonify({"jobId": job.id, "status": job.status, "statusUrl": f"/jobs/{job.id}"}), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Reports a job's status, progress and the bids collected so far.
+
+    Pass ``?since=N`` to receive only the bids after the first N already fetched.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    since = request.args.get('since', default=0, type=int)
+    return jsonify(job.to_dict(since=max(0, since))), 200
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancels a queued or running job."""
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify({"jobId": job.id, "status": job.status}), 200
 
 if __name__ == '__main__':
     # app.run(debug=True, port=5001)
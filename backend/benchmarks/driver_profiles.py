@@ -0,0 +1,83 @@
+"""Compares the browser driver profiles on recorded GeM results pages.
+
+Starts the fixture server, then for every profile in ``utils.driver_setup.PROFILES``
+starts one Chrome, loads each recorded results page ``--runs`` times and reports
+the median page-load time (navigation until the cards are in the DOM), the bytes
+transferred per page (Resource Timing API) and the resident memory of the whole
+Chrome process tree after the run::
+
+    python -m benchmarks.driver_profiles --pages 5 --runs 3
+"""
+import argparse
+import json
+import statistics
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from fixtures.gem_server import GemFixtureServer
+from utils.driver_setup import PROFILES, get_webdriver
+from utils.memory import process_tree_rss
+
+TRANSFER_SIZE_SCRIPT = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+return entries.reduce((total, entry) => total + (entry.transferSize || 0), 0);
+"""
+
+
+def measure_profile(profile, base_url, pages, runs):
+    driver = get_webdriver(profile)
+    try:
+        load_times, transferred = [], []
+        for _ in range(runs):
+            for page in range(1, pages + 1):
+                started = time.perf_counter()
+                driver.get(f"{base_url}/recorded/results?page={page}")
+                WebDriverWait(driver, 30, poll_frequency=0.05).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, ".card"))
+                )
+                load_times.append(time.perf_counter() - started)
+                # Let late assets finish so that every transferred byte is counted.
+                WebDriverWait(driver, 30).until(lambda d: d.execute_script("return document.readyState") == "complete")
+                transferred.append(driver.execute_script(TRANSFER_SIZE_SCRIPT))
+        return {
+            "profile": profile,
+            "pages_loaded": len(load_times),
+            "median_load_ms": round(statistics.median(load_times) * 1000, 1),
+            "median_kib_per_page": round(statistics.median(transferred) / 1024, 1),
+            "chrome_rss_mib": round(process_tree_rss(driver.service.process.pid) / 2 ** 20, 1),
+        }
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare browser driver profiles on recorded GeM pages.")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--output", help="Also write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    with GemFixtureServer(pages=args.pages) as server:
+        results = [measure_profile(profile, server.url, args.pages, args.runs) for profile in args.profiles]
+
+    columns = ("profile", "pages_loaded", "median_load_ms", "median_kib_per_page", "chrome_rss_mib")
+    print("  ".join(f"{column:>20}" for column in columns))
+    for result in results:
+        print("  ".join(f"{result[column]:>20}" for column in columns))
+    if len(results) > 1:
+        baseline = results[0]
+        for result in results[1:]:
+            changes = ", ".join(
+                f"{column} {100 * (result[column] - baseline[column]) / baseline[column]:+.0f}%"
+                for column in columns[2:] if baseline[column]
+            )
+            print(f"{result['profile']} vs {baseline['profile']}: {changes}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Offline performance suite for the scrapers, run against the fixture server.
+
+    python -m benchmarks.suite                      # http engine, checked against the baselines
+    python -m benchmarks.suite --engine browser     # GemBidScraper; needs Chrome
+    python -m benchmarks.suite --save-baseline      # record the current numbers as the baseline
+
+Each round times ``load_page``, ``apply_filters_and_search`` up to the first
+results page, the navigation to every following results page and the
+extraction of each card, then checks how long a "Something went wrong" page
+takes to surface as ``PortalError``. Timings are summarised like
+pytest-benchmark (min/median/mean/stddev); peak Python memory comes from a
+separate tracemalloc round, plus the Chrome process tree RSS for the browser
+engine. The run exits with status 1 when a median or a memory figure is worse
+than the stored baseline by more than the tolerance.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from fixtures.gem_server import GemFixtureServer
+from scrapers.base import PortalError
+from utils.memory import process_tree_rss
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+BENCH_STATE = "ANDHRA PRADESH"
+# Medians are compared with this much absolute slack on top of the relative
+# tolerance, so sub-millisecond steps do not fail on timer noise.
+SLACK_MS = 1.0
+
+
+class Recorder:
+    """Collects timing samples per benchmark name."""
+
+    def __init__(self):
+        self.samples = {}
+
+    @contextmanager
+    def measure(self, name, count=1):
+        """Times the block; ``count`` splits the time over that many items (e.g. cards)."""
+        started = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - started
+        if count:
+            self.samples.setdefault(name, []).extend([elapsed / count] * count)
+
+    def summary(self):
+        return {
+            name: {
+                "rounds": len(values),
+                "min_ms": round(min(values) * 1000, 3),
+                "median_ms": round(statistics.median(values) * 1000, 3),
+                "mean_ms": round(statistics.mean(values) * 1000, 3),
+                "stddev_ms": round(statistics.stdev(values) * 1000, 3) if len(values) > 1 else 0.0,
+            }
+            for name, values in self.samples.items()
+        }
+
+
+def open_scraper(engine, base_url, logger, extraction, profile):
+    """Returns ``(scraper, close, browser_pid)`` for a scraper pointed at the fixture server."""
+    if engine == "http":
+        from scrapers.gem_http_scraper import GemHttpScraper
+        from utils.http_session import create_session
+
+        session = create_session()
+        return GemHttpScraper(session, logger, base_url=base_url), session.close, None
+
+    from scrapers.gem_scraper import GemBidScraper
+    from utils.driver_setup import get_webdriver
+
+    driver = get_webdriver(profile)
+    scraper = GemBidScraper(driver, logger, extraction=extraction)
+    scraper.url = f"{base_url}/advance-search"
+    return scraper, driver.quit, driver.service.process.pid
+
+
+class _CannedResponse:
+    """The parts of a ``requests.Response`` that ``GemHttpScraper._parse_response`` reads."""
+
+    def __init__(self, body):
+        self.text = json.dumps(body)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def card_extractor(scraper, engine, server, page_num):
+    """Returns a callable extracting the cards of the page the scraper is on, the way its engine does.
+
+    For the HTTP engine that is decoding the page's JSON search response and
+    mapping its documents to cards.
+    """
+    if engine == "http":
+        response = _CannedResponse(server.search_page(page_num))
+        return lambda: scraper._parse_response(response)[0]
+    return lambda: scraper.extract_cards(scraper.driver)
+
+
+def run_round(recorder, engine, server, logger, extraction, profile):
+    """One full scrape of the fixture results; returns the Chrome RSS in bytes (or None)."""
+    scraper, close, browser_pid = open_scraper(engine, server.url, logger, extraction, profile)
+    try:
+        with recorder.measure("load_page"):
+            scraper.load_page()
+        pages = scraper._iter_pages(1)
+        # Up to the first results page: the HTTP engine only fetches it when asked for it.
+        with recorder.measure("apply_filters_and_search"):
+            scraper.apply_filters_and_search(state=BENCH_STATE)
+            next(pages)
+        page_num = 1
+        while True:
+            extract = card_extractor(scraper, engine, server, page_num)
+            cards = extract()
+            with recorder.measure("card_extraction", count=len(cards)):
+                extract()
+            started = time.perf_counter()
+            try:
+                next(pages)
+            except StopIteration:
+                break
+            recorder.samples.setdefault("page_navigation", []).append(time.perf_counter() - started)
+            page_num += 1
+        return process_tree_rss(browser_pid) if browser_pid else None
+    finally:
+        close()
+
+
+def run_error_round(recorder, engine, server, logger, extraction, profile):
+    """Times how long an error page on page 2 takes to surface as ``PortalError``."""
+    scraper, close, _ = open_scraper(engine, server.url, logger, extraction, profile)
+    server.error_pages = {2}
+    try:
+        scraper.load_page()
+        scraper.apply_filters_and_search(state=BENCH_STATE)
+        pages = scraper._iter_pages(1)
+        next(pages)
+        with recorder.measure("portal_error"):
+            try:
+                next(pages)
+            except PortalError:
+                pass
+            else:
+                raise AssertionError("The fixture error page was not reported as PortalError")
+    finally:
+        server.error_pages = set()
+        close()
+
+
+def run_suite(engine, rounds, pages, cards_per_page, latency, extraction, profile):
+    logger = logging.getLogger("benchmarks")
+    recorder = Recorder()
+    chrome_rss = []
+    with GemFixtureServer(pages=pages, cards_per_page=cards_per_page, latency=latency) as server:
+        # One unmeasured round warms imports, connections and the browser cache.
+        run_round(Recorder(), engine, server, logger, extraction, profile)
+        for _ in range(rounds):
+            rss = run_round(recorder, engine, server, logger, extraction, profile)
+            if rss:
+                chrome_rss.append(rss)
+        run_error_round(recorder, engine, server, logger, extraction, profile)
+
+        # Memory is traced in a separate round since tracemalloc slows everything down.
+        tracemalloc.start()
+        run_round(Recorder(), engine, server, logger, extraction, profile)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    results = {
+        "settings": {"rounds": rounds, "pages": pages, "cards_per_page": cards_per_page, "latency": latency},
+        "timings": recorder.summary(),
+        "memory": {"python_peak_kib": round(peak / 1024, 1)},
+    }
+    if chrome_rss:
+        results["memory"]["chrome_rss_mib"] = round(max(chrome_rss) / 2 ** 20, 1)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the human-readable regressions of ``results`` against ``baseline``."""
+    regressions = []
+    for name, stats in results["timings"].items():
+        expected = baseline.get("timings", {}).get(name)
+        if expected and stats["median_ms"] > expected["median_ms"] * (1 + tolerance) + SLACK_MS:
+            regressions.append(f"{name}: median {stats['median_ms']} ms vs baseline {expected['median_ms']} ms")
+    for name, value in results["memory"].items():
+        expected = baseline.get("memory", {}).get(name)
+        if expected and value > expected * (1 + tolerance):
+            regressions.append(f"{name}: {value} vs baseline {expected}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against the offline GeM fixture server.")
+    parser.add_argument("--engine", choices=("http", "browser"), default="http")
+    parser.add_argument("--extraction", default="script", help="Card extraction strategy for the browser engine.")
+    parser.add_argument("--profile", default="standard", help="Driver profile for the browser engine.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--cards-per-page", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every fixture search request.")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative slowdown before failing.")
+    parser.add_argument("--baselines", default=BASELINES_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    results = run_suite(args.engine, args.rounds, args.pages, args.cards_per_page, args.latency,
+                        args.extraction, args.profile)
+    key = args.engine if args.engine == "http" else f"browser-{args.profile}-{args.extraction}"
+
+    print(f"{'benchmark':<28}{'rounds':>8}{'min ms':>12}{'median ms':>12}{'mean ms':>12}{'stddev ms':>12}")
+    for name, stats in results["timings"].items():
+        print(f"{name:<28}{stats['rounds']:>8}{stats['min_ms']:>12}{stats['median_ms']:>12}"
+              f"{stats['mean_ms']:>12}{stats['stddev_ms']:>12}")
+    for name, value in results["memory"].items():
+        print(f"{name:<28}{value:>8}")
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+    if args.save_baseline:
+        baselines[key] = results
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved baseline '{key}' to {args.baselines}")
+        return 0
+    if key not in baselines:
+        print(f"No baseline for '{key}'; run with --save-baseline to record one.")
+        return 0
+
+    if baselines[key].get("settings") != results["settings"]:
+        print(f"Note: baseline '{key}' was recorded with {baselines[key].get('settings')}.")
+    regressions = compare(results, baselines[key], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions against baseline '{key}' (tolerance {args.tolerance:.0%}).")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
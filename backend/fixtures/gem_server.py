@@ -0,0 +1,372 @@
+"""A local stand-in for the GeM advance-search endpoints.
+
+Serves the advance-search page (with the CSRF cookie and hidden field the HTTP
+engine needs) and paginated ``/search-bids`` responses generated from the
+sample documents in ``fixtures/responses``, so the scrapers can be exercised
+without touching the live portal. The advance-search page is interactive
+enough for the browser engine: the consignee tab, state select, sort select,
+``searchBid('con')`` loading the cards over XHR and a ``#light-pagination``
+widget. ``/recorded/results?page=N`` renders the same bids as a full results
+page with the portal's kind of assets (stylesheet, web font, images, analytics
+tag) for comparing browser profiles. ``/showbidDocument/<id>`` serves a small
+PDF bid document with the estimated value, EMD amount and item category.
+
+Latency can be added to every search request, and chosen pages, the searches
+of chosen states (or a random share of requests) answer with the portal's
+"Something went wrong" error::
+
+    python -m fixtures.gem_server --port 8765 --pages 5 --latency 0.2 --error-pages 3
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from scrapers.states import INDIAN_STATES
+
+RESPONSES_DIR = os.path.join(os.path.dirname(__file__), "responses")
+CSRF_TOKEN = "fixture-csrf-token"
+
+ADVANCE_SEARCH_HTML = """<!DOCTYPE html>
+<html><head><title>GeM Advance Search</title></head>
+<body>
+<ul class="nav nav-tabs"><li><a id="location-tab" href="#location">Consignee Location</a></li></ul>
+<form><input type="hidden" name="csrf_bd_gem_nk" value="{token}">
+<div id="location">
+  <select id="state_name_con"><option value="">Select State</option>{state_options}</select>
+  <input id="bidEndFromCon" type="text" value="">
+  <button type="button" onclick="searchBid('con')">Search</button>
+</div>
+<select id="sort"><option value="">Relevance</option><option value="Bid-Start-Date-Latest">Bid Start Date: Latest First</option></select>
+</form>
+<div id="bidCard"></div>
+<div id="light-pagination"></div>
+<script>
+function renderResults(page, body) {
+    document.getElementById('bidCard').innerHTML = body.html;
+    const pages = Math.ceil((body.numFound || 0) / {page_size});
+    let links = '';
+    for (let n = 1; n <= pages; n++) {
+        links += n === page ? '<span class="current">' + n + '</span>'
+            : '<a href="#" onclick="searchBid(\'con\', ' + n + '); return false;">' + n + '</a>';
+    }
+    if (page < pages) {
+        links += '<a href="#" class="next" onclick="searchBid(\'con\', ' + (page + 1) + '); return false;">Next</a>';
+    }
+    document.getElementById('light-pagination').innerHTML = links;
+}
+function searchBid(type, page) {
+    page = page || 1;
+    const payload = {
+        searchType: type,
+        state_name_con: document.getElementById('state_name_con').value,
+        bidEndFromCon: document.getElementById('bidEndFromCon').value,
+        sort: document.getElementById('sort').value,
+        page: page,
+    };
+    const form = new URLSearchParams({payload: JSON.stringify(payload), csrf_bd_gem_nk: '{token}', render: 'html'});
+    return fetch('/search-bids', {method: 'POST', body: form})
+        .then((response) => response.json())
+        .then((body) => renderResults(page, body));
+}
+document.getElementById('sort').addEventListener('change', () => searchBid('con', 1));
+</script>
+</body></html>
+"""
+
+PORTAL_ERROR_HTML = '<div class="alert alert-danger">Something went wrong, please try again after some time</div>'
+
+RESULTS_PAGE_HTML = """<!DOCTYPE html>
+<html><head><title>GeM Bids - page {page}</title>
+<link rel="stylesheet" href="/assets/portal.css">
+<link rel="preload" href="/assets/portal.woff2" as="font" type="font/woff2" crossorigin>
+<script async src="https://www.googletagmanager.com/gtag/js?id=G-FIXTURE"></script>
+</head>
+<body>
+<img src="/assets/banner.jpg" alt="GeM"><img src="/assets/logo.png" alt="">
+<div id="bidCard">
+{cards}
+</div>
+<div id="light-pagination"><span class="current">{page}</span>{next_link}</div>
+</body></html>
+"""
+
+CARD_HTML = """<div class="card">
+  <div class="block_header"><p class="bid_no pull-left"><a class="bid_no_hover" href="/showbidDocument/{doc_id}">{bid_number}</a></p></div>
+  <div class="card-body">
+    <div class="col-md-4">
+      <div class="row"><strong>Items:</strong> <a href="#">{items}</a></div>
+      <div class="row"><strong>Quantity:</strong> {quantity}</div>
+    </div>
+    <div class="col-md-5">
+      <div class="row"><strong>Department Name And Address:</strong></div>
+      <div class="row">{ministry}<br>{department}</div>
+    </div>
+    <div class="col-md-3">
+      <div class="row"><strong>Start Date:</strong> <span class="start_date">{start_date}</span></div>
+      <div class="row"><strong>End Date:</strong> <span class="end_date">{end_date}</span></div>
+    </div>
+  </div>
+</div>"""
+
+# name -> (content type, size in bytes), sized like the live portal's assets.
+ASSETS = {
+    "portal.css": ("text/css", 180 * 1024),
+    "portal.woff2": ("font/woff2", 75 * 1024),
+    "banner.jpg": ("image/jpeg", 320 * 1024),
+    "logo.png": ("image/png", 45 * 1024),
+}
+
+
+def minimal_pdf(lines):
+    """A one-page PDF showing ``lines`` of ASCII text in Helvetica."""
+    def literal(line):
+        return "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+    stream = "BT /F1 10 Tf 14 TL 50 800 Td " + " ".join(f"{literal(line)} Tj T*" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+    ]
+    body = "%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n"
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n" + "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return body.encode("latin-1")
+
+
+def load_sample_docs():
+    """Returns the sample search documents shipped with the fixtures."""
+    with open(os.path.join(RESPONSES_DIR, "search_bids.json"), encoding="utf-8") as f:
+        return json.load(f)["response"]["response"]["docs"]
+
+
+def generate_docs(count, newest=datetime(2025, 6, 30, 18, 0), step=timedelta(minutes=37)):
+    """Builds ``count`` search documents, latest start date first, by cycling the samples."""
+    samples = load_sample_docs()
+    docs = []
+    for i in range(count):
+        doc = copy.deepcopy(samples[i % len(samples)])
+        started = newest - step * i
+        doc["id"] = str(7300000 - i)
+        doc["b_id"] = [7300000 - i]
+        doc["b_bid_number"] = [f"GEM/2025/B/{6400000 - i}"]
+        doc["final_start_date_sort"] = [started.strftime('%Y-%m-%dT%H:%M:%SZ')]
+        doc["final_end_date_sort"] = [(started + timedelta(days=10)).strftime('%Y-%m-%dT%H:%M:%SZ')]
+        docs.append(doc)
+    return docs
+
+
+class GemFixtureServer:
+    """Runs the stand-in portal on a background thread; usable as a context manager."""
+
+    def __init__(self, pages=3, cards_per_page=10, host="127.0.0.1", port=0,
+                 latency=0.0, error_pages=(), error_states=(), error_rate=0.0, seed=0):
+        self.cards_per_page = cards_per_page
+        self.docs = generate_docs(pages * cards_per_page)
+        self.latency = latency
+        self.error_pages = set(error_pages)
+        self.error_states = set(error_states)
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.requests_served = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="gem-fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def advance_search_html(self):
+        options = "".join(f'<option value="{escape(name)}">{escape(name)}</option>' for name in INDIAN_STATES)
+        return (ADVANCE_SEARCH_HTML.replace("{token}", CSRF_TOKEN)
+                .replace("{state_options}", options)
+                .replace("{page_size}", str(self.cards_per_page)))
+
+    def is_error_page(self, page, state=None):
+        """Whether this request for ``page`` (of a search for ``state``) should answer with the portal error."""
+        return (page in self.error_pages or state in self.error_states
+                or (self.error_rate and self._random.random() < self.error_rate))
+
+    def search_page(self, page):
+        start = (page - 1) * self.cards_per_page
+        return {
+            "code": 200,
+            "status": 1,
+            "response": {"response": {
+                "numFound": len(self.docs),
+                "start": start,
+                "docs": self.docs[start:start + self.cards_per_page],
+            }},
+        }
+
+    def cards_html(self, page):
+        """Renders the cards of one results page the way the portal shows them."""
+        def value(doc, key):
+            raw = doc.get(key)
+            if isinstance(raw, list):
+                raw = raw[0] if raw else ""
+            return escape(str(raw))
+
+        def portal_date(doc, key):
+            return datetime.strptime(value(doc, key)[:19], '%Y-%m-%dT%H:%M:%S').strftime('%d-%m-%Y %I:%M %p')
+
+        start = (page - 1) * self.cards_per_page
+        cards = [
+            CARD_HTML.format(
+                doc_id=value(doc, "id"),
+                bid_number=value(doc, "b_bid_number"),
+                items=value(doc, "b_category_name"),
+                quantity=value(doc, "b_total_quantity"),
+                ministry=value(doc, "ba_official_details_minName"),
+                department=value(doc, "ba_official_details_deptName"),
+                start_date=portal_date(doc, "final_start_date_sort"),
+                end_date=portal_date(doc, "final_end_date_sort"),
+            )
+            for doc in self.docs[start:start + self.cards_per_page]
+        ]
+        return "\n".join(cards)
+
+    def bid_document(self, doc_id):
+        """The PDF bid document of a generated bid, or None for an unknown id."""
+        doc = next((doc for doc in self.docs if doc["id"] == doc_id), None)
+        if doc is None:
+            return None
+        estimated_value = (int(doc_id) % 97 + 1) * 25000
+        return minimal_pdf([
+            "Bid Document",
+            f"Bid Number: {doc['b_bid_number'][0]}",
+            f"Item Category {doc['b_category_name'][0]}",
+            f"Estimated Bid Value {estimated_value:,}",
+            "EMD Detail",
+            f"EMD Amount {estimated_value // 50:,}",
+        ])
+
+    def results_html(self, page):
+        """Renders a full results page, assets included."""
+        has_next = page * self.cards_per_page < len(self.docs)
+        next_link = f'<a class="next" href="/recorded/results?page={page + 1}">Next</a>' if has_next else ""
+        return RESULTS_PAGE_HTML.format(page=page, cards=self.cards_html(page), next_link=next_link)
+
+    def _handler_class(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type, headers=None):
+                fixture.requests_served += 1
+                payload = body.encode("utf-8") if isinstance(body, str) else body
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                path = url.path.rstrip("/")
+                if path == "/advance-search":
+                    self._send(200, fixture.advance_search_html(), "text/html; charset=utf-8",
+                               {"Set-Cookie": f"csrf_gem_cookie={CSRF_TOKEN}; Path=/"})
+                elif path == "/recorded/results":
+                    page = max(1, int(parse_qs(url.query).get("page", ["1"])[0]))
+                    time.sleep(fixture.latency)
+                    if fixture.is_error_page(page):
+                        self._send(200, RESULTS_PAGE_HTML.format(page=page, cards=PORTAL_ERROR_HTML, next_link=""),
+                                   "text/html; charset=utf-8")
+                    else:
+                        self._send(200, fixture.results_html(page), "text/html; charset=utf-8")
+                elif path.startswith("/showbidDocument/"):
+                    document = fixture.bid_document(path.rsplit("/", 1)[1])
+                    time.sleep(fixture.latency)
+                    if document is None:
+                        self._send(404, "Not Found", "text/plain")
+                    else:
+                        self._send(200, document, "application/pdf")
+                elif path.startswith("/assets/") and path[len("/assets/"):] in ASSETS:
+                    content_type, size = ASSETS[path[len("/assets/"):]]
+                    self._send(200, b"\0" * size, content_type, {"Cache-Control": "no-store"})
+                else:
+                    self._send(404, "Not Found", "text/plain")
+
+            def do_POST(self):
+                if self.path.split("?")[0] != "/search-bids":
+                    self._send(404, "Not Found", "text/plain")
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                if form.get("csrf_bd_gem_nk", [""])[0] != CSRF_TOKEN:
+                    self._send(403, json.dumps({"code": 403, "message": "Invalid token"}), "application/json")
+                    return
+                payload = json.loads(form.get("payload", ["{}"])[0])
+                page = max(1, int(payload.get("page", 1)))
+                as_html = form.get("render", [""])[0] == "html"
+                time.sleep(fixture.latency)
+                if fixture.is_error_page(page, payload.get("state_name_con")):
+                    body = {"html": PORTAL_ERROR_HTML, "numFound": 0} if as_html else {"code": 500, "message": PORTAL_ERROR_HTML}
+                elif as_html:
+                    body = {"html": fixture.cards_html(page), "numFound": len(fixture.docs)}
+                else:
+                    body = fixture.search_page(page)
+                self._send(200, json.dumps(body), "application/json")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the GeM advance search.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--cards-per-page", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every search request.")
+    parser.add_argument("--error-pages", type=int, nargs="*", default=[], help="Pages answering with the portal error.")
+    parser.add_argument("--error-states", nargs="*", default=[], help="States whose searches answer with the portal error.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of other requests answering with it.")
+    args = parser.parse_args()
+    server = GemFixtureServer(pages=args.pages, cards_per_page=args.cards_per_page, port=args.port,
+                              latency=args.latency, error_pages=args.error_pages, error_states=args.error_states,
+                              error_rate=args.error_rate)
+    print(f"Serving GeM fixtures on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
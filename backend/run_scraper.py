@@ -41,7 +41,7 @@ def main():
         input()
     finally:
         if driver:
-            scraper.close_driver()
+            driver.quit()
             print("WebDriver closed.")
 
 if __name__ == "__main__":
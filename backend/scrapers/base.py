@@ -0,0 +1,141 @@
+import time
+from scrapers.bid import BASE_URL, DATE_FORMAT, Bid, parse_portal_date
+from utils.timing import span
+
+
+class PortalError(Exception):
+    """The GeM portal answered with its "Something went wrong" error, or did not show results in time."""
+
+
+class ScrapeCancelled(Exception):
+    """The scrape was stopped by its ``should_stop`` callback."""
+
+
+class BaseBidScraper:
+    """Shared date-window filtering and pagination bookkeeping for the scraper engines.
+
+    Engines implement ``_load_page``, ``_apply_filters_and_search`` and
+    ``_iter_pages``, which yields the raw card dicts of each results page in turn
+    (see ``scrapers.card_extractors`` for the card format). When ``timings`` is
+    set to a ``utils.timing.ScrapeTimings``, the phases and pages are timed.
+    """
+
+    def __init__(self, logger):
+        self.url = f"{BASE_URL}/advance-search"
+        self.logger = logger
+        self.sorted_by_start_date = False
+        self.run_report = {}
+        # State of the current search; every bid is tagged with it.
+        self.state = None
+        self.timings = None
+
+    def span(self, phase):
+        return span(self.timings, phase)
+
+    def load_page(self, reload=False):
+        """Opens the advance-search page, or gets the session ready for searching."""
+        with self.span("load_page"):
+            self._load_page(reload)
+
+    def apply_filters_and_search(self, state, start_date=None):
+        """Runs the consignee search for ``state``; see the engine's ``_apply_filters_and_search``."""
+        self.state = state
+        with self.span("filters"):
+            self._apply_filters_and_search(state, start_date)
+
+    def _load_page(self, reload=False):
+        raise NotImplementedError
+
+    def _apply_filters_and_search(self, state, start_date=None):
+        raise NotImplementedError
+
+    def page_count(self):
+        """Number of result pages for the current search, or None when unknown."""
+        return None
+
+    def _iter_pages(self, start_page=1):
+        raise NotImplementedError
+
+    def scrape_bids(self, start_date=None, end_date=None, on_page=None, should_stop=None,
+                    start_page=1, max_pages=None):
+        """Scrapes bid information from all pages, collecting only bids within the date window.
+
+        Returns a list of ``Bid`` records. ``on_page(page_num, page_bids)`` is
+        called after every page; see ``iter_bids`` for the remaining arguments.
+        """
+        all_bids = []
+        for page_num, page_bids in self.iter_bids(start_date, end_date, should_stop=should_stop,
+                                                  start_page=start_page, max_pages=max_pages):
+            all_bids.extend(page_bids)
+            if on_page:
+                on_page(page_num, page_bids)
+
+        if not all_bids:
+            self.logger.info("Scraping completed. No bids matched the date criteria.")
+        else:
+            self.logger.info(f"Scraping completed. Found {len(all_bids)} bids.")
+        return all_bids
+
+    def iter_bids(self, start_date=None, end_date=None, should_stop=None, start_page=1, max_pages=None):
+        """Yields ``(page_num, page_bids)`` as each results page is scraped.
+
+        ``should_stop()`` is checked before moving on to the next page; a truthy
+        answer raises ``ScrapeCancelled``. ``start_page`` and ``max_pages`` limit
+        the scrape to a range of result pages. ``run_report`` is filled in once
+        the generator is exhausted.
+        """
+        pages_visited = 0
+        pages_with_bids = 0
+        stopped_early = False
+        self.logger.info(f"Starting scrape with Start Date: {start_date} and End Date: {end_date}")
+        page_started = time.perf_counter()
+        for page_num, cards in enumerate(self._iter_pages(start_page), start=start_page):
+            pages_visited += 1
+            page_older_than_window = True
+            page_bids = []
+            for card in cards:
+                bid_start_date = parse_portal_date(card["start_date"])
+                if bid_start_date is None:
+                    raw_text = card["start_date"] or "not found"
+                    self.logger.error(f"Could not parse start date. Raw text: '{raw_text}'.")
+                    page_older_than_window = False
+                    continue
+
+                if not start_date or bid_start_date >= start_date:
+                    page_older_than_window = False
+
+                # Only process the bid if it's within the specified date range
+                if start_date and end_date:
+                    if not (start_date <= bid_start_date <= end_date):
+                        continue # Skip this bid
+
+                page_bids.append(Bid.from_card(card, bid_start_date, state=self.state))
+
+            if page_bids:
+                pages_with_bids += 1
+            if self.timings is not None:
+                self.timings.page(page_num, time.perf_counter() - page_started, len(page_bids), self.state)
+            yield page_num, page_bids
+            page_started = time.perf_counter()
+
+            # With results sorted latest first, a page made up entirely of bids that
+            # started before the window means every later page is older still.
+            if start_date and self.sorted_by_start_date and page_older_than_window:
+                self.logger.info(f"Page {page_num} is entirely older than {start_date}; stopping early.")
+                stopped_early = True
+                break
+
+            if max_pages and pages_visited >= max_pages:
+                break
+
+            if should_stop and should_stop():
+                self.logger.info(f"Scrape cancelled after page {page_num}.")
+                raise ScrapeCancelled(f"Scrape cancelled after page {page_num}")
+
+        self.run_report = {
+            "pages_visited": pages_visited,
+            "pages_with_bids": pages_with_bids,
+            "stopped_early": stopped_early,
+            "sorted_by_start_date": self.sorted_by_start_date,
+        }
+        self.logger.info(f"Visited {pages_visited} page(s), {pages_with_bids} contributed bids (stopped early: {stopped_early}).")
@@ -0,0 +1,125 @@
+import copy
+import re
+from datetime import datetime
+from urllib.parse import urljoin
+
+BASE_URL = "https://bidplus.gem.gov.in"
+DATE_FORMAT = '%d-%m-%Y %I:%M %p'
+NOT_FOUND = "Not Found"
+
+
+def parse_portal_date(text):
+    """Parses a portal date ("30-06-2025 10:15 AM", optionally followed by more lines)."""
+    try:
+        return datetime.strptime(text.split('\n')[0].strip(), DATE_FORMAT)
+    except (AttributeError, ValueError):
+        return None
+
+
+QUANTITY_PATTERN = re.compile(r"\d{1,3}(?:,\d{2,3})+|\d+")
+
+
+def quantity_text(text):
+    """The quantity as the portal shows it: the text after "Quantity:", stripped."""
+    if text is None:
+        return None
+    return str(text).split(':')[-1].strip()
+
+
+def parse_quantity(text):
+    """Integer quantity from text such as "Quantity: 1,200"; None unless it is a whole number."""
+    value = quantity_text(text)
+    if value is None or not QUANTITY_PATTERN.fullmatch(value):
+        return None
+    return int(value.replace(",", ""))
+
+
+class Bid:
+    """One scraped bid, with its dates and quantity parsed.
+
+    Missing fields are ``None``. The quantity and dates are also kept as the
+    portal showed them (``quantity_text``, ``start_text``, ``end_text``), since
+    they do not always parse; ``to_dict`` returns that text (and "Not Found"
+    fallbacks), as the API always has. ``details`` holds the fields read from the bid
+    document on the copies an enriched scrape returns (see ``with_details``
+    and ``scrapers.bid_details``).
+    """
+
+    __slots__ = ("bid_number", "bid_url", "items", "quantity", "department", "start_at", "end_at", "state", "details",
+                 "quantity_text", "start_text", "end_text")
+
+    def __init__(self, bid_number, bid_url, items, quantity, department, start_at, end_at, state=None,
+                 quantity_text=None, start_text=None, end_text=None):
+        self.bid_number = bid_number
+        self.bid_url = bid_url
+        self.items = items
+        self.quantity = quantity
+        self.department = department
+        self.start_at = start_at
+        self.end_at = end_at
+        self.state = state
+        self.details = None
+        self.quantity_text = quantity_text
+        self.start_text = start_text
+        self.end_text = end_text
+
+    @classmethod
+    def from_card(cls, card, start_at, state=None):
+        """Builds a bid from a raw card dict (see ``scrapers.card_extractors``) found searching ``state``."""
+        href = card["href"]
+        return cls(
+            bid_number=card["bid_number"],
+            bid_url=urljoin(BASE_URL, href) if href else None,
+            items=card["items"].strip() if card["items"] is not None else None,
+            quantity=parse_quantity(card["quantity"]),
+            department=card["department"].strip() if card["department"] is not None else None,
+            start_at=start_at,
+            end_at=parse_portal_date(card["end_date"]),
+            state=state,
+            quantity_text=quantity_text(card["quantity"]),
+            start_text=card["start_date"],
+            end_text=card["end_date"],
+        )
+
+    def with_details(self, details):
+        """A copy of this bid carrying ``details``; the records shared with the result cache stay untouched."""
+        bid = copy.copy(self)
+        bid.details = details
+        return bid
+
+    def to_dict(self):
+        if self.bid_number is None:
+            bid_url = NOT_FOUND
+        else:
+            bid_url = self.bid_url or ""
+        data = {
+            "bid_number": self.bid_number if self.bid_number is not None else NOT_FOUND,
+            "bid_url": bid_url,
+            "items": self.items if self.items is not None else NOT_FOUND,
+            "quantity": self._quantity_text(),
+            "department": self.department if self.department is not None else NOT_FOUND,
+            "start_date": self._start_text(),
+            "end_date": self._end_text(),
+            "state": self.state,
+        }
+        if self.details is not None:
+            data["details"] = self.details
+        return data
+
+    def _quantity_text(self):
+        if self.quantity_text is not None:
+            return self.quantity_text
+        return str(self.quantity) if self.quantity is not None else NOT_FOUND
+
+    def _start_text(self):
+        if self.start_text is not None:
+            return self.start_text
+        return self.start_at.strftime(DATE_FORMAT)
+
+    def _end_text(self):
+        if self.end_text is not None:
+            return self.end_text
+        return self.end_at.strftime(DATE_FORMAT) if self.end_at else NOT_FOUND
+
+    def __repr__(self):
+        return f"Bid({self.bid_number!r}, start_at={self.start_at!r})"
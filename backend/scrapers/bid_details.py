@@ -0,0 +1,273 @@
+"""Optional enrichment of scraped bids with details read from their bid documents.
+
+A bid's ``bid_url`` (``/showbidDocument/<id>``) serves the bid document, a
+PDF on the live portal. The estimated bid value, EMD amount and item category
+are read from its text; PDFs need ``pypdf`` installed, HTML pages are read
+with BeautifulSoup.
+"""
+import io
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+import requests
+from bs4 import BeautifulSoup
+from utils.http_session import get_session_pool
+from utils.metrics import BID_DOCUMENTS
+from utils.rate_limit import TokenBucket
+from utils.timing import span
+
+DETAIL_FIELDS = ("estimated_value", "emd_amount", "category")
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_AMOUNT = r"[\s:\-]*(?:Rs\.?|INR|\u20b9)?\s*([\d,]+(?:\.\d+)?)"
+AMOUNT_PATTERNS = {
+    "estimated_value": re.compile(r"Estimated\s+Bid\s+Value" + _AMOUNT, re.IGNORECASE),
+    "emd_amount": re.compile(r"EMD\s+Amount" + _AMOUNT, re.IGNORECASE),
+}
+CATEGORY_PATTERN = re.compile(r"Item\s+Category\s*[:\-]?\s*([^\n]+)", re.IGNORECASE)
+
+
+class DetailsUnavailable(Exception):
+    """Raised when a bid document cannot be read in this environment (e.g. pypdf is missing)."""
+
+
+class _RetryableStatus(Exception):
+    pass
+
+
+def document_text(content):
+    """Text of a bid document: a PDF (needs ``pypdf``) or an HTML page."""
+    if content.startswith(b"%PDF"):
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            raise DetailsUnavailable("Reading bid documents (PDF) requires pypdf. Install it with: pip install pypdf")
+        reader = PdfReader(io.BytesIO(content))
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+    return BeautifulSoup(content, "html.parser").get_text("\n")
+
+
+def parse_bid_details(text):
+    """Reads the estimated bid value, EMD amount (as floats) and item category from a document's text."""
+    details = dict.fromkeys(DETAIL_FIELDS)
+    for field, pattern in AMOUNT_PATTERNS.items():
+        match = pattern.search(text)
+        if match:
+            details[field] = float(match.group(1).replace(",", ""))
+    match = CATEGORY_PATTERN.search(text)
+    if match and match.group(1).strip():
+        details["category"] = match.group(1).strip()
+    return details
+
+
+class DocumentCache:
+    """Bid documents on disk, one file per bid number; documents do not change once published.
+
+    Documents not read for ``max_age`` seconds are dropped, and the least
+    recently used go first once the directory holds more than ``max_bytes``.
+    The directory is pruned every ``prune_every`` writes.
+    """
+
+    def __init__(self, directory, logger, max_bytes=500 * 2 ** 20, max_age=30 * 24 * 3600, prune_every=50):
+        self.directory = directory
+        self.logger = logger
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.prune()
+
+    def _path(self, bid_number):
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_-]", "_", bid_number))
+
+    def get(self, bid_number):
+        path = self._path(bid_number)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with open(path, "rb") as f:
+                content = f.read()
+            # The modification time doubles as the last use, for eviction.
+            os.utime(path)
+            return content
+        except OSError:
+            return None
+
+    def put(self, bid_number, content):
+        """Stores a document; a failed write only costs a download next time."""
+        path = self._path(bid_number)
+        partial = f"{path}.{threading.get_ident()}.part"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(partial, "wb") as f:
+                f.write(content)
+            os.replace(partial, path)
+        except OSError as e:
+            self.logger.warning(f"Could not cache the bid document of {bid_number}: {e}")
+            return
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.prune_every == 0
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Deletes expired documents, then the least recently used until the directory fits ``max_bytes``."""
+        now = time.time()
+        entries = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    if entry.is_file():
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError as e:
+            self.logger.warning(f"Could not prune the bid document cache: {e}")
+            return
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            self.logger.info(f"Evicted {removed} document(s) from the bid document cache ({total / 2 ** 20:.1f} MiB left).")
+
+
+class BidEnricher:
+    """Fetches the documents behind ``bid_url`` concurrently and returns the bids with their details.
+
+    Each scrape gets ``workers`` threads checking sessions out of the shared
+    HTTP session pool; every fetch takes a token from a bucket shared by all
+    scrapes. Connection errors and 429/5xx answers are retried with
+    exponential backoff. Documents are cached on disk by bid number, so each
+    is downloaded once.
+    """
+
+    def __init__(self, logger, workers=4, rate=4.0, retries=2, backoff=1.0, timeout=30,
+                 cache_dir=None, cache_max_bytes=500 * 2 ** 20, cache_max_age=30 * 24 * 3600, base_url=None):
+        self.logger = logger
+        self.workers = max(1, workers)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.base_url = base_url
+        self.bucket = TokenBucket(rate, capacity=self.workers)
+        self.cache = DocumentCache(cache_dir, logger, max_bytes=cache_max_bytes, max_age=cache_max_age) if cache_dir else None
+        self._lock = threading.Lock()
+
+    def iter_pages(self, pages, report, timings=None):
+        """Enriches ``(page_num, bids)`` pairs as they arrive and yields them in order once their details are in.
+
+        The documents of a page are fetched while the following pages are still
+        being scraped. The yielded bids are copies carrying ``details`` (see
+        ``Bid.with_details``), so records held by the result cache never keep
+        the details, or a transient failure, of one request. Fills ``report``
+        with document counts once the pages are exhausted.
+        """
+        started = time.monotonic()
+        stats = {"bids": 0, "cached": 0, "fetched": 0, "failed": 0}
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bid-details")
+        pending = deque()
+        try:
+            for page_num, page_bids in pages:
+                futures = [executor.submit(self._details, bid, stats, timings) for bid in page_bids]
+                pending.append((page_num, page_bids, futures))
+                while pending and all(future.done() for future in pending[0][2]):
+                    yield self._settle(pending.popleft())
+            while pending:
+                yield self._settle(pending.popleft())
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            report.update(stats, seconds=round(time.monotonic() - started, 2))
+
+    @staticmethod
+    def _settle(entry):
+        page_num, page_bids, futures = entry
+        enriched = []
+        for bid, future in zip(page_bids, futures):
+            details = future.result()
+            enriched.append(bid.with_details(details) if details is not None else bid)
+        return page_num, enriched
+
+    def _details(self, bid, stats, timings):
+        """Details read from a bid's document, an ``error`` entry when it cannot be read, or None without a document."""
+        if not bid.bid_number or not bid.bid_url:
+            return None
+        source = "cached"
+        try:
+            content = self.cache.get(bid.bid_number) if self.cache else None
+            if content is None:
+                source = "fetched"
+                with span(timings, "detail_fetch"):
+                    content = self._fetch(bid.bid_url)
+                if self.cache:
+                    self.cache.put(bid.bid_number, content)
+            with span(timings, "detail_parse"):
+                details = parse_bid_details(document_text(content))
+        except Exception as e:
+            self.logger.warning(f"Could not read the bid document of {bid.bid_number}: {e}")
+            details = dict(dict.fromkeys(DETAIL_FIELDS), error=str(e))
+            source = "failed"
+        BID_DOCUMENTS.inc(source=source)
+        with self._lock:
+            stats["bids"] += 1
+            stats[source] += 1
+        return details
+
+    def _fetch(self, bid_url):
+        """Downloads one document, retrying transient failures."""
+        url = urljoin(self.base_url, urlsplit(bid_url).path) if self.base_url else bid_url
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            try:
+                with get_session_pool().session() as session:
+                    response = session.get(url, timeout=self.timeout)
+                if response.status_code in RETRY_STATUSES:
+                    raise _RetryableStatus(f"HTTP {response.status_code} from {url}")
+                response.raise_for_status()
+                return response.content
+            except (requests.ConnectionError, requests.Timeout, _RetryableStatus) as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                self.logger.info(f"Retrying {url} in {delay:.1f}s after: {e}")
+                time.sleep(delay)
+
+
+_enricher = None
+_enricher_lock = threading.Lock()
+
+
+def get_bid_enricher(logger=None):
+    """Returns the process-wide bid enricher."""
+    global _enricher
+    with _enricher_lock:
+        if _enricher is None:
+            _enricher = BidEnricher(
+                logger,
+                workers=int(os.environ.get("BID_DETAIL_WORKERS", 4)),
+                rate=float(os.environ.get("BID_DETAIL_RATE", 4)),
+                retries=int(os.environ.get("BID_DETAIL_RETRIES", 2)),
+                cache_dir=os.environ.get("BID_DETAIL_CACHE_DIR", os.path.join("data", "bid_documents")),
+                cache_max_bytes=int(os.environ.get("BID_DETAIL_CACHE_MAX_MB", 500)) * 2 ** 20,
+                cache_max_age=int(os.environ.get("BID_DETAIL_CACHE_MAX_DAYS", 30)) * 24 * 3600,
+                base_url=os.environ.get("GEM_BASE_URL"),
+            )
+        return _enricher
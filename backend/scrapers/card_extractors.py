@@ -0,0 +1,110 @@
+"""Strategies for pulling the raw fields out of the ``.card`` elements of a results page.
+
+Every extractor returns one dict per card with the keys ``bid_number``, ``href``,
+``items``, ``quantity``, ``department``, ``start_date`` and ``end_date``. A value
+of ``None`` means the element was not present on the card; the scraper applies
+the "Not Found" fallbacks on top of that.
+"""
+from selenium.webdriver.common.by import By
+
+ITEMS_XPATH = ".//strong[contains(text(), 'Items:')]/following-sibling::a"
+QUANTITY_XPATH = ".//strong[contains(text(), 'Quantity:')]/.."
+DEPARTMENT_XPATH = ".//strong[contains(text(), 'Department Name And Address:')]/../following-sibling::div"
+
+# Reads every card on the page in a single WebDriver round trip. The XPath
+# expressions are the same ones the element-by-element path uses.
+EXTRACT_CARDS_SCRIPT = """
+const first = (xpath, ctx) => document.evaluate(
+    xpath, ctx, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const text = (el) => el ? el.innerText : null;
+return Array.from(document.querySelectorAll('.card')).map((card) => {
+    const link = card.querySelector('a.bid_no_hover');
+    return {
+        bid_number: text(link),
+        href: link ? link.getAttribute('href') : null,
+        items: text(first(arguments[0], card)),
+        quantity: text(first(arguments[1], card)),
+        department: text(first(arguments[2], card)),
+        start_date: text(card.querySelector('.start_date')),
+        end_date: text(card.querySelector('.end_date')),
+    };
+});
+"""
+
+
+def _element_text(card, by, selector):
+    try:
+        return card.find_element(by, selector).text
+    except Exception:
+        return None
+
+
+def extract_cards_dom(driver):
+    """Reads each card field with its own WebDriver call (one round trip per field)."""
+    cards = []
+    for card in driver.find_elements(By.CSS_SELECTOR, ".card"):
+        try:
+            href = card.find_element(By.CSS_SELECTOR, "a.bid_no_hover").get_attribute('href')
+        except Exception:
+            href = None
+        cards.append({
+            "bid_number": _element_text(card, By.CSS_SELECTOR, "a.bid_no_hover"),
+            "href": href,
+            "items": _element_text(card, By.XPATH, ITEMS_XPATH),
+            "quantity": _element_text(card, By.XPATH, QUANTITY_XPATH),
+            "department": _element_text(card, By.XPATH, DEPARTMENT_XPATH),
+            "start_date": _element_text(card, By.CLASS_NAME, "start_date"),
+            "end_date": _element_text(card, By.CLASS_NAME, "end_date"),
+        })
+    return cards
+
+
+def extract_cards_script(driver):
+    """Reads every card on the page with a single ``execute_script`` call."""
+    return driver.execute_script(EXTRACT_CARDS_SCRIPT, ITEMS_XPATH, QUANTITY_XPATH, DEPARTMENT_XPATH) or []
+
+
+def _first_labelled(card, label):
+    for strong in card.find_all("strong"):
+        if label in strong.get_text():
+            return strong
+    return None
+
+
+def _soup_text(el):
+    return el.get_text("\n", strip=True) if el is not None else None
+
+
+def parse_cards_html(html):
+    """Parses the cards out of an HTML document or fragment with BeautifulSoup."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    cards = []
+    for card in soup.select(".card"):
+        link = card.select_one("a.bid_no_hover")
+        items_label = _first_labelled(card, "Items:")
+        quantity_label = _first_labelled(card, "Quantity:")
+        department_label = _first_labelled(card, "Department Name And Address:")
+        cards.append({
+            "bid_number": _soup_text(link),
+            "href": link.get("href") if link is not None else None,
+            "items": _soup_text(items_label.find_next_sibling("a")) if items_label else None,
+            "quantity": _soup_text(quantity_label.parent) if quantity_label else None,
+            "department": _soup_text(department_label.parent.find_next_sibling("div")) if department_label else None,
+            "start_date": _soup_text(card.select_one(".start_date")),
+            "end_date": _soup_text(card.select_one(".end_date")),
+        })
+    return cards
+
+
+def extract_cards_html(driver):
+    """Grabs ``page_source`` once and parses the cards locally."""
+    return parse_cards_html(driver.page_source)
+
+
+EXTRACTORS = {
+    "dom": extract_cards_dom,
+    "script": extract_cards_script,
+    "html": extract_cards_html,
+}
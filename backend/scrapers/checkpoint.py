@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class Checkpoint:
+    """Progress of one scrape, kept so it can continue where the portal failed.
+
+    ``plans`` maps every searched state (``None`` for all of India) to its
+    result-cache plan; the states whose plan has a window are the ones
+    scraped. For each of those the checkpoint records the next results page,
+    the pages seen so far and whether the state is finished. ``delivered``
+    holds every bid already handed to the client, cached or scraped, so a
+    resumed scrape can return the complete result.
+    """
+
+    def __init__(self, params, plans):
+        self.params = params
+        self.plans = plans
+        self.delivered = []
+        self.fresh = {state: [] for state, plan in plans.items() if plan.window}
+        self.progress = {
+            state: {"next_page": 1, "pages_visited": 0, "pages_with_bids": 0, "seconds": 0.0, "done": False}
+            for state in self.fresh
+        }
+        self.retries = 0
+        self.resumed = False
+        self.resumable = True
+
+    def pending(self):
+        """``{state: window}`` of the states still to be scraped, in request order."""
+        return {state: self.plans[state].window for state, progress in self.progress.items() if not progress["done"]}
+
+    def deliver(self, bids):
+        """Records bids handed to the client from the result cache."""
+        self.delivered.extend(bids)
+
+    def add_page(self, page_bids):
+        """Records scraped bids handed to the client; they are also kept for the result cache.
+
+        A batch keeps them per state. A single-state or all-India scrape keeps
+        them under the requested scope, whichever state shard found them.
+        """
+        self.delivered.extend(page_bids)
+        if not self.params.get("states"):
+            self.fresh[self.params.get("state")].extend(page_bids)
+            return
+        for bid in page_bids:
+            self.fresh[bid.state].append(bid)
+
+    def page_done(self, state, page_num, page_bids):
+        """Moves ``state`` past a completed results page."""
+        progress = self.progress[state]
+        progress["next_page"] = page_num + 1
+        progress["pages_visited"] += 1
+        if page_bids:
+            progress["pages_with_bids"] += 1
+
+    def state_done(self, state, run_report=None):
+        progress = self.progress[state]
+        progress["done"] = True
+        if run_report:
+            progress["stopped_early"] = run_report["stopped_early"]
+            progress["sorted_by_start_date"] = run_report["sorted_by_start_date"]
+
+    def state_report(self, state):
+        """Page counts and seconds of a state across every attempt, shaped like a scraper's ``run_report``."""
+        progress = self.progress[state]
+        report = {key: progress[key] for key in ("pages_visited", "pages_with_bids", "stopped_early", "sorted_by_start_date")
+                  if key in progress}
+        report["seconds"] = round(progress["seconds"], 2)
+        return report
+
+    def position(self):
+        """Where a resumed scrape picks up: the first unfinished state and its next page."""
+        for state, progress in self.progress.items():
+            if not progress["done"]:
+                return {"state": state, "page": progress["next_page"]}
+        return None
+
+
+class CheckpointStore:
+    """Checkpoints of failed scrapes, kept for ``ttl`` seconds under a resume token.
+
+    At most ``max_entries`` are kept (they hold the bids collected so far); the
+    oldest go first. A token can be redeemed once.
+    """
+
+    def __init__(self, max_entries=50, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, checkpoint):
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._expire()
+            self._entries[token] = (time.monotonic() + self.ttl, checkpoint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return token
+
+    def get(self, token):
+        """Returns the checkpoint saved under ``token`` without redeeming it, or None."""
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(token)
+            return entry[1] if entry else None
+
+    def take(self, token):
+        """Redeems ``token``: returns its checkpoint and forgets it, or None when unknown or expired."""
+        with self._lock:
+            self._expire()
+            entry = self._entries.pop(token, None)
+            return entry[1] if entry else None
+
+    def _expire(self):
+        now = time.monotonic()
+        for token in [token for token, (expires_at, _) in self._entries.items() if expires_at < now]:
+            del self._entries[token]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store():
+    """Returns the process-wide checkpoint store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CheckpointStore(
+                max_entries=int(os.environ.get("SCRAPE_CHECKPOINT_MAX", 50)),
+                ttl=int(os.environ.get("SCRAPE_CHECKPOINT_TTL", 3600)),
+            )
+        return _store
@@ -0,0 +1,39 @@
+import os
+from contextlib import ExitStack, contextmanager
+from scrapers.base import PortalError
+from scrapers.gem_scraper import GemBidScraper
+from scrapers.gem_http_scraper import GemHttpScraper
+from utils.driver_pool import get_driver_pool
+from utils.http_session import get_session_pool
+from utils.metrics import PORTAL_ERRORS
+from utils.timing import span
+
+ENGINES = ("browser", "http")
+
+
+@contextmanager
+def open_scraper(engine, logger, extraction="script", profile=None, timings=None):
+    """Yields a ready-to-use scraper for ``engine`` and returns its driver or session afterwards.
+
+    ``browser`` drives a pooled headless Chrome started with the given driver
+    ``profile`` (``DRIVER_PROFILE`` by default); ``http`` talks to the portal's
+    search endpoint directly through a pooled ``requests.Session``. Checking the
+    driver or session out of its pool is timed as the ``session_acquire`` phase.
+    A ``PortalError`` discards the driver or session, so a retry starts afresh.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown scraper engine '{engine}'. Choose one of: {', '.join(ENGINES)}")
+    with ExitStack() as stack:
+        with span(timings, "session_acquire"):
+            if engine == "http":
+                session = stack.enter_context(get_session_pool().session(discard_on=(PortalError,)))
+                scraper = GemHttpScraper(session, logger, base_url=os.environ.get("GEM_BASE_URL"))
+            else:
+                driver = stack.enter_context(get_driver_pool(logger, profile=profile).driver())
+                scraper = GemBidScraper(driver, logger, extraction=extraction)
+        scraper.timings = timings
+        try:
+            yield scraper
+        except PortalError:
+            PORTAL_ERRORS.inc(engine=engine)
+            raise
@@ -0,0 +1,172 @@
+import json
+import re
+from datetime import datetime
+from scrapers.base import BaseBidScraper, PortalError, DATE_FORMAT
+from scrapers.card_extractors import parse_cards_html
+
+CSRF_FIELD = "csrf_bd_gem_nk"
+CSRF_COOKIE = "csrf_gem_cookie"
+SEARCH_PATH = "/search-bids"
+SORT_START_DATE_LATEST = "Bid-Start-Date-Latest"
+PAGE_SIZE = 10
+
+
+class GemHttpScraper(BaseBidScraper):
+    """Scrapes the advance-search results straight from the XHR endpoint behind ``searchBid('con')``.
+
+    Exposes the same ``load_page`` / ``apply_filters_and_search`` / ``scrape_bids``
+    interface as ``GemBidScraper`` without starting a browser.
+    """
+
+    def __init__(self, session, logger, base_url=None, timeout=30):
+        super().__init__(logger)
+        self.session = session
+        self.timeout = timeout
+        if base_url:
+            self.url = f"{base_url.rstrip('/')}/advance-search"
+        self.search_url = self.url.rsplit('/', 1)[0] + SEARCH_PATH
+        self.filters = {}
+        self._first_page = None
+        self._total = None
+        self._results_loaded = False
+
+    def _load_page(self, reload=False):
+        """Fetches the advance-search page to obtain the session cookies and CSRF token."""
+        if not reload and getattr(self.session, "gem_csrf", None):
+            self.logger.info("Reusing CSRF token from pooled session.")
+            return
+        response = self.session.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        token = self.session.cookies.get(CSRF_COOKIE)
+        if not token:
+            match = re.search(rf'name="{CSRF_FIELD}"\s+value="([^"]+)"', response.text)
+            token = match.group(1) if match else None
+        if not token:
+            raise Exception("Could not find the CSRF token on the advance-search page.")
+        self.session.gem_csrf = token
+
+    def _apply_filters_and_search(self, state, start_date=None):
+        """Builds the consignee search filters.
+
+        No page is fetched yet: a scrape starting further down the results
+        would have to throw page 1 away.
+        """
+        self.logger.info(f"Applying filters. State: {state}")
+        self.filters = {
+            "searchType": "con",
+            "state_name_con": state.strip() if state else "",
+            "city_name_con": "",
+            # Every bid ends after it starts, so this is a safe prefilter for a start-date window.
+            "bidEndFromCon": start_date.strftime('%d-%m-%Y') if start_date else "",
+            "bidEndToCon": "",
+            "sort": SORT_START_DATE_LATEST,
+        }
+        self._first_page = None
+        self._total = None
+        self._results_loaded = False
+        self.sorted_by_start_date = False
+
+    def page_count(self):
+        if not self._results_loaded and self.filters:
+            self._first_page = self._fetch_results(1)
+        total = self._total
+        return -(-total // PAGE_SIZE) if total is not None else None
+
+    def _fetch_results(self, page_num):
+        """Fetches a page of the current search; the first one fetched tells the match count and sort order."""
+        cards, total = self._fetch_page(page_num)
+        if not self._results_loaded:
+            self._results_loaded = True
+            self._total = total
+            self.sorted_by_start_date = self._is_sorted(cards)
+            self.logger.info(f"Bid results loaded successfully ({total} matching bids).")
+        return cards, total
+
+    def _iter_pages(self, start_page=1):
+        """Yields the raw cards of each results page, starting at ``start_page``."""
+        page_num = start_page
+        if start_page == 1 and self._first_page:
+            cards, total = self._first_page
+        else:
+            cards, total = self._fetch_results(page_num)
+        self._first_page = None
+        while cards:
+            yield cards
+            if total is not None and page_num * PAGE_SIZE >= total:
+                self.logger.info("No more pages found. Finalizing scrape.")
+                break
+            page_num += 1
+            self.logger.info(f"Fetching page {page_num}...")
+            cards, total = self._fetch_page(page_num)
+
+    def _fetch_page(self, page_num, retry_auth=True):
+        """Posts the search for one page and returns ``(cards, total_matches)``."""
+        payload = dict(self.filters, page=page_num)
+        with self.span("page_fetch"):
+            response = self.session.post(
+                self.search_url,
+                data={"payload": json.dumps(payload), CSRF_FIELD: getattr(self.session, "gem_csrf", "")},
+                headers={"X-Requested-With": "XMLHttpRequest", "Referer": self.url},
+                timeout=self.timeout,
+            )
+        if response.status_code in (401, 403, 419) and retry_auth:
+            # The token expired; fetch a fresh one and retry once.
+            self.load_page(reload=True)
+            return self._fetch_page(page_num, retry_auth=False)
+        response.raise_for_status()
+        if "Something went wrong" in response.text:
+            raise PortalError(f"The GeM portal returned an error on page {page_num}: 'Something went wrong'.")
+        with self.span("extraction"):
+            return self._parse_response(response)
+
+    def _parse_response(self, response):
+        try:
+            body = response.json()
+        except ValueError:
+            return parse_cards_html(response.text), None
+        if isinstance(body, dict) and isinstance(body.get("html"), str):
+            return parse_cards_html(body["html"]), body.get("numFound")
+
+        result = body.get("response", {}).get("response", {})
+        return [self._doc_to_card(doc) for doc in result.get("docs", [])], result.get("numFound")
+
+    @staticmethod
+    def _doc_to_card(doc):
+        """Maps one search-index document to the raw card format shared with the browser engine."""
+        def first(key):
+            value = doc.get(key)
+            if isinstance(value, list):
+                value = value[0] if value else None
+            return str(value) if value is not None else None
+
+        def portal_date(key):
+            value = first(key)
+            if not value:
+                return None
+            try:
+                return datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S').strftime(DATE_FORMAT)
+            except ValueError:
+                return value
+
+        department = "\n".join(filter(None, [first("ba_official_details_minName"), first("ba_official_details_deptName")]))
+        doc_id = first("b_id") or first("id")
+        return {
+            "bid_number": first("b_bid_number"),
+            "href": f"/showbidDocument/{doc_id}" if doc_id else "",
+            "items": first("b_category_name"),
+            "quantity": first("b_total_quantity"),
+            "department": department or None,
+            "start_date": portal_date("final_start_date_sort"),
+            "end_date": portal_date("final_end_date_sort"),
+        }
+
+    @staticmethod
+    def _is_sorted(cards):
+        """True when the page's start dates are non-increasing, i.e. the sort was honoured."""
+        dates = []
+        for card in cards:
+            try:
+                dates.append(datetime.strptime(card["start_date"], DATE_FORMAT))
+            except (TypeError, ValueError):
+                return False
+        return all(a >= b for a, b in zip(dates, dates[1:]))
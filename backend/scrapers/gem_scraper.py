@@ -1,22 +1,76 @@
 import logging
-import time
-import pandas as pd
 import re
-from datetime import datetime
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from scrapers.base import BaseBidScraper, PortalError
+from scrapers.card_extractors import EXTRACTORS
+from scrapers.page_waits import AdaptiveTimeout, PageWaiter, SEARCH_TIMEOUT
 
-class GemBidScraper:
-    def __init__(self, driver, logger):
+# Candidate inputs for the consignee search's "bid end date from" filter. Every
+# bid ends after it starts, so filtering on end date >= start_date is a safe
+# server-side prefilter for a start-date window.
+END_DATE_FROM_SELECTORS = ("#bidEndFromCon", "#fromEndDateCon", "input[name='bidEndFromCon']")
+
+# Picks the results sort option for "start date, latest first" when the portal offers one.
+SORT_BY_START_DATE_SCRIPT = """
+for (const select of document.querySelectorAll('select')) {
+    for (const option of select.options) {
+        const label = option.text.toLowerCase();
+        if (label.includes('start date') && (label.includes('latest') || label.includes('newest') || label.includes('desc'))) {
+            if (select.value === option.value) { return 'already'; }
+            select.value = option.value;
+            select.dispatchEvent(new Event('change', {bubbles: true}));
+            return 'changed';
+        }
+    }
+}
+return null;
+"""
+
+# The results pagination is the jQuery simplePagination plugin; fall back to the
+# highest page number rendered in the widget when the plugin API is unavailable.
+PAGE_COUNT_SCRIPT = """
+const widget = window.jQuery ? window.jQuery('#light-pagination') : null;
+if (widget && widget.length && widget.pagination) {
+    try { return widget.pagination('getPagesCount'); } catch (e) {}
+}
+let max = null;
+document.querySelectorAll('#light-pagination a, #light-pagination span').forEach((el) => {
+    const n = parseInt(el.textContent, 10);
+    if (!isNaN(n) && (max === null || n > max)) { max = n; }
+});
+return max;
+"""
+
+SELECT_PAGE_SCRIPT = """
+const widget = window.jQuery ? window.jQuery('#light-pagination') : null;
+if (widget && widget.length && widget.pagination) {
+    widget.pagination('selectPage', arguments[0]);
+    return true;
+}
+return false;
+"""
+
+class GemBidScraper(BaseBidScraper):
+    def __init__(self, driver, logger, extraction="script"):
+        super().__init__(logger)
         self.driver = driver
-        self.url = "https://bidplus.gem.gov.in/advance-search"
-        self.logger = logger
+        self.waiter = PageWaiter(driver, logger)
+        if extraction not in EXTRACTORS:
+            raise ValueError(f"Unknown extraction strategy '{extraction}'. Choose one of: {', '.join(EXTRACTORS)}")
+        self.extraction = extraction
+        self.extract_cards = EXTRACTORS[extraction]
+
+    def _load_page(self, reload=False):
+        """Loads the advanced search page.
 
-    def load_page(self):
-        """Loads the advanced search page."""
-        self.driver.get(self.url)
+        Pooled drivers are parked on the advance-search page when they are reset,
+        so the navigation is skipped unless ``reload`` is set.
+        """
+        if reload or self.driver.current_url.rstrip('/') != self.url:
+            self.driver.get(self.url)
         try:
             WebDriverWait(self.driver, 30).until(
                 EC.presence_of_element_located((By.CLASS_NAME, "nav-tabs"))
@@ -25,8 +79,14 @@ class GemBidScraper:
             # Optionally log this error to a file
             raise
 
-    def apply_filters_and_search(self, state):
-        """Applies filters on the advanced search page and clicks search."""
+    def _apply_filters_and_search(self, state, start_date=None):
+        """Applies filters on the advanced search page and clicks search.
+
+        When ``start_date`` is given, bids that ended before it are filtered out by
+        the portal, and the results are sorted by start date (latest first) where
+        the portal supports it.
+        """
+        self.sorted_by_start_date = False
         try:
             self.logger.info(f"Applying filters. State: {state}")
             if state and state.strip():
@@ -44,11 +104,16 @@ class GemBidScraper:
                     state_dropdown = Select(state_dropdown_elem)
                     state_dropdown.select_by_visible_text(state)
                     self.logger.info(f"Successfully selected state: {state}")
-                    time.sleep(1)  # Brief pause for any JS to trigger
+                    # Selecting a state can trigger AJAX lookups (e.g. its cities).
+                    self.waiter.wait_for_idle("the state filter to settle")
                 except Exception as e:
                     self.logger.error(f"Could not select state '{state}'. It might not be available or the filter section failed to open. Error: {e}")
                     raise Exception(f"Failed to select state: {state}")
 
+            if start_date:
+                self._apply_end_date_from(start_date)
+
+            marker = self.waiter.mark()
             # More robustly click the search button
             try:
                 self.logger.info("Locating and clicking search button...")
@@ -62,155 +127,149 @@ class GemBidScraper:
                 self.driver.execute_script("searchBid('con');")
 
             self.logger.info("Waiting for search results or an error message...")
-            WebDriverWait(self.driver, 40).until(
-                EC.any_of(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".card")),
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "#bidCard .alert.alert-danger"))
-                )
-            )
+            try:
+                self.waiter.wait_for_results(marker, "search results", timeouts=SEARCH_TIMEOUT)
+            except TimeoutException as e:
+                raise PortalError("The GeM portal did not show the search results in time.") from e
 
             try:
                 error_element = self.driver.find_element(By.CSS_SELECTOR, "#bidCard .alert.alert-danger")
                 if "Something went wrong" in error_element.text:
                     self.logger.error("Detected server-side error message on GeM portal.")
-                    raise Exception("The GeM portal returned an error: 'Something went wrong, please try again after some time'. This is an issue with the website, not the scraper.")
+                    raise PortalError("The GeM portal returned an error: 'Something went wrong, please try again after some time'. This is an issue with the website, not the scraper.")
             except NoSuchElementException:
                 self.logger.info("Bid results loaded successfully.")
+
+            self.sorted_by_start_date = self._sort_by_start_date()
         except Exception as e:
             self.logger.error(f"An error occurred during filter application: {e}")
             self.driver.save_screenshot('debug_screenshot_filters.png')
             raise
 
-    def scrape_bids(self, start_date=None, end_date=None):
-        """Scrapes bid information from all pages, collecting only bids newer than stop_date."""
-        all_bids = []
-        page_num = 1
-        self.logger.info(f"Starting scrape with Start Date: {start_date} and End Date: {end_date}")
-        while True:  # Loop indefinitely until the last page is reached
+    def _apply_end_date_from(self, start_date):
+        """Fills the "bid end date from" filter if the search form has one."""
+        for selector in END_DATE_FROM_SELECTORS:
             try:
-                WebDriverWait(self.driver, 20).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".card"))
-                )
-                bid_blocks = self.driver.find_elements(By.CSS_SELECTOR, ".card")
-            except Exception:
-                self.logger.info("No bid cards found on page, ending scrape.")
-                break # No bid blocks found, likely end of results
-
-            if not bid_blocks:
-                self.logger.info(f"No bid blocks found for the given criteria, ending scrape.")
-                break
-
-            for bid in bid_blocks:
-                try:
-                    start_date_str = bid.find_element(By.CLASS_NAME, "start_date").text.split('\n')[0]
-                    bid_start_date = datetime.strptime(start_date_str, '%d-%m-%Y %I:%M %p')
-                except Exception as e:
-                    raw_text = "not found"
-                    try:
-                        raw_text = bid.find_element(By.CLASS_NAME, "start_date").text
-                    except:
-                        pass
-                    self.logger.error(f"Could not parse start date. Raw text: '{raw_text}'. Error: {e}")
-                    continue
-
-                # Only process the bid if it's within the specified date range
-                if start_date and end_date:
-                    if not (start_date <= bid_start_date <= end_date):
-                        continue # Skip this bid
+                date_input = self.driver.find_element(By.CSS_SELECTOR, selector)
+            except NoSuchElementException:
+                continue
+            self.driver.execute_script(
+                "arguments[0].value = arguments[1];"
+                "arguments[0].dispatchEvent(new Event('change', {bubbles: true}));",
+                date_input, start_date.strftime('%d-%m-%Y')
+            )
+            self.logger.info(f"Filtering out bids that ended before {start_date:%d-%m-%Y} ({selector}).")
+            return True
+        self.logger.info("No end date filter found on the search form; filtering by date client-side only.")
+        return False
 
-                try:
-                    bid_no = bid.find_element(By.CSS_SELECTOR, "a.bid_no_hover").text
-                except Exception:
-                    bid_no = "Not Found"
+    def _sort_by_start_date(self):
+        """Asks the portal to sort results by start date, latest first.
 
-                try:
-                    items = bid.find_element(By.XPATH, ".//strong[contains(text(), 'Items:')]/following-sibling::a").text.strip()
-                except Exception:
-                    items = "Not Found"
+        Returns True when the results are known to be sorted that way. The
+        wait for the re-sorted results has a timer of its own, so a slow
+        re-sort does not stretch the shared search timeout.
+        """
+        try:
+            marker = self.waiter.mark()
+            outcome = self.driver.execute_script(SORT_BY_START_DATE_SCRIPT)
+            if outcome == "changed":
+                if not self.waiter.reload_started(marker):
+                    self.logger.info("Choosing the start date sort did not re-run the search; "
+                                     "every results page will be visited.")
+                    return False
+                self.waiter.wait_for_results(marker, "re-sorted results",
+                                             timeouts=AdaptiveTimeout(initial=SEARCH_TIMEOUT.timeout))
+        except Exception as e:
+            self.logger.warning(f"Could not sort results by start date: {e}")
+            return False
+        if outcome is None:
+            self.logger.info("The portal offers no start date sort; every results page will be visited.")
+            return False
+        self.logger.info("Results are sorted by start date, latest first.")
+        return True
 
-                try:
-                    quantity_text = bid.find_element(By.XPATH, ".//strong[contains(text(), 'Quantity:')]/..").text
-                    quantity = quantity_text.split(':')[-1].strip()
-                except Exception:
-                    quantity = "Not Found"
+    def page_count(self):
+        """Reads the number of result pages from the pagination widget."""
+        try:
+            count = self.driver.execute_script(PAGE_COUNT_SCRIPT)
+            return int(count) if count else None
+        except Exception as e:
+            self.logger.warning(f"Could not read the number of result pages: {e}")
+            return None
 
-                try:
-                    department = bid.find_element(By.XPATH, ".//strong[contains(text(), 'Department Name And Address:')]/../following-sibling::div").text.strip()
-                except Exception:
-                    department = "Not Found"
+    def _iter_pages(self, start_page=1):
+        """Yields the raw cards of the current results page, then of each following page.
 
-                try:
-                    scraped_end_date_str = bid.find_element(By.CLASS_NAME, "end_date").text
-                except Exception:
-                    scraped_end_date_str = "Not Found"
+        Every page is read only after ``PageWaiter`` saw the previous results
+        replaced, so a page is never read twice or skipped.
+        """
+        page_num = start_page
+        if start_page > 1:
+            self._goto_page(start_page)
+        while True:  # Loop indefinitely until the last page is reached
+            try:
+                with self.span("extraction"):
+                    cards = self.extract_cards(self.driver)
+            except Exception as e:
+                self.logger.info(f"Could not read bid cards on page {page_num}, ending scrape. Error: {e}")
+                break
 
-                bid_url = ""
-                try:
-                    bid_link_element = bid.find_element(By.CSS_SELECTOR, "a.bid_no_hover")
-                    href = bid_link_element.get_attribute('href')
-                    if href:
-                        bid_url = f"https://bidplus.gem.gov.in{href}"
-                except Exception:
-                    bid_url = "Not Found"
-
-                bid_data = {
-                    "bid_number": bid_no,
-                    "bid_url": bid_url,
-                    "items": items,
-                    "quantity": quantity,
-                    "department": department,
-                    "start_date": start_date_str,
-                    "end_date": scraped_end_date_str,
-                }
-                all_bids.append(bid_data)
+            if not cards:
+                self.logger.info(f"No bid blocks found for the given criteria, ending scrape.")
+                break
 
+            yield cards
 
             # Pagination
             try:
                 # Find the 'next' button to see if another page exists
                 next_page_button = self.driver.find_element(By.CSS_SELECTOR, "#light-pagination a.next")
+                marker = self.waiter.mark()
                 self.driver.execute_script("arguments[0].click();", next_page_button)
                 page_num += 1
                 self.logger.info(f"Navigating to page {page_num}...")
-
-                # Wait for the next page's content OR an error message to appear
-                WebDriverWait(self.driver, 40).until(
-                    EC.any_of(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, ".card")),
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "#bidCard .alert.alert-danger"))
-                    )
-                )
-
-                # After waiting, check if the error message is present
-                try:
-                    error_element = self.driver.find_element(By.CSS_SELECTOR, "#bidCard .alert.alert-danger")
-                    if "Something went wrong" in error_element.text:
-                        error_msg = f"The GeM portal returned an error on page {page_num}: 'Something went wrong'."
-                        self.logger.error(error_msg)
-                        raise Exception(error_msg)
-                except NoSuchElementException:
-                    # No error found, page loaded successfully
-                    self.logger.info(f"Page {page_num} loaded successfully.")
-
+                self._wait_for_page(marker, page_num)
             except NoSuchElementException:
                 # This is the normal exit condition: no 'next' button was found.
                 self.logger.info("No more pages found. Finalizing scrape.")
                 break
             except Exception as e:
-                # This will catch the explicit raise from our error check, or a TimeoutException if neither bids nor error appeared.
+                # This will catch the explicit raise from our error check, including a page that never appeared.
                 self.logger.error(f"Failed to navigate to page {page_num}. Error: {e}")
                 raise e # Re-raise to be handled by app.py
 
-        if not all_bids:
-            self.logger.info("Scraping completed. No bids matched the date criteria.")
-            return pd.DataFrame()
+    def _wait_for_page(self, marker, page_num):
+        """Waits for a results page to replace ``marker``; raises PortalError on the portal's error banner or a timeout."""
+        with self.span("page_wait"):
+            try:
+                state = self.waiter.wait_for_results(marker, f"page {page_num}")
+            except TimeoutException as e:
+                # A portal too slow to answer is retried and resumed like its error banner.
+                raise PortalError(f"The GeM portal did not show results page {page_num} in time.") from e
+        if state["page"] is not None and state["page"] != page_num:
+            self.logger.warning(f"Expected results page {page_num}, but the pagination shows page {state['page']}.")
 
-        self.logger.info(f"Scraping completed. Found {len(all_bids)} bids.")
-        bids_df = pd.DataFrame(all_bids)
-        return bids_df
+        # After waiting, check if the error message is present
+        try:
+            error_element = self.driver.find_element(By.CSS_SELECTOR, "#bidCard .alert.alert-danger")
+            if "Something went wrong" in error_element.text:
+                error_msg = f"The GeM portal returned an error on page {page_num}: 'Something went wrong'."
+                self.logger.error(error_msg)
+                raise PortalError(error_msg)
+        except NoSuchElementException:
+            # No error found, page loaded successfully
+            self.logger.info(f"Page {page_num} loaded successfully.")
 
-    def close_driver(self):
-        """Closes the WebDriver."""
-        if self.driver:
-            self.driver.quit()
-            self.logger.info("WebDriver closed.")
\ No newline at end of file
+    def _goto_page(self, page_num):
+        """Jumps straight to a results page through the pagination plugin, stepping with 'next' as a fallback."""
+        self.logger.info(f"Jumping to page {page_num}...")
+        marker = self.waiter.mark()
+        if self.driver.execute_script(SELECT_PAGE_SCRIPT, page_num):
+            self._wait_for_page(marker, page_num)
+            return
+        for current in range(2, page_num + 1):
+            marker = self.waiter.mark()
+            next_page_button = self.driver.find_element(By.CSS_SELECTOR, "#light-pagination a.next")
+            self.driver.execute_script("arguments[0].click();", next_page_button)
+            self._wait_for_page(marker, current)
\ No newline at end of file
@@ -0,0 +1,159 @@
+import threading
+import time
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# One round trip for the state of the results area: the first rendered card (as
+# a WebElement, so a re-render shows up as a different element), the active page
+# of the simplePagination widget, outstanding jQuery AJAX requests and the
+# portal's error banner.
+RESULTS_STATE_SCRIPT = """
+const current = document.querySelector('#light-pagination .current:not(.prev):not(.next)');
+const page = current ? parseInt(current.textContent, 10) : NaN;
+return {
+    first: document.querySelector('.card'),
+    page: Number.isNaN(page) ? null : page,
+    pending: window.jQuery ? window.jQuery.active : 0,
+    error: !!document.querySelector('#bidCard .alert.alert-danger'),
+};
+"""
+
+POLL_INTERVAL = 0.1
+# How long an action gets to show that it started re-rendering the results.
+RELOAD_START_SECONDS = 2.0
+
+
+class AdaptiveTimeout:
+    """Wait timeout learned from recent latencies, in the style of TCP's retransmission timer.
+
+    Keeps exponentially weighted averages of the latency and its deviation;
+    the timeout is ``mean + 4 * deviation`` clamped to ``[minimum, maximum]``.
+    A timed-out wait doubles the timeout for the next attempt.
+    """
+
+    def __init__(self, initial=40.0, minimum=20.0, maximum=90.0, alpha=0.125, beta=0.25):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.alpha = alpha
+        self.beta = beta
+        self._mean = None
+        self._deviation = 0.0
+        self._timeout = initial
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self):
+        with self._lock:
+            return self._timeout
+
+    def observe(self, seconds):
+        with self._lock:
+            if self._mean is None:
+                self._mean, self._deviation = seconds, seconds / 2
+            else:
+                self._deviation += self.beta * (abs(seconds - self._mean) - self._deviation)
+                self._mean += self.alpha * (seconds - self._mean)
+            self._timeout = max(self.minimum, min(self.maximum, self._mean + 4 * self._deviation))
+
+    def backoff(self):
+        with self._lock:
+            self._timeout = min(self.maximum, self._timeout * 2)
+
+
+# Shared by every browser session of the process, since they all talk to the same portal.
+PAGE_TIMEOUT = AdaptiveTimeout(initial=40.0)
+SEARCH_TIMEOUT = AdaptiveTimeout(initial=40.0)
+IDLE_TIMEOUT = AdaptiveTimeout(initial=10.0, minimum=2.0, maximum=30.0)
+
+
+class ResultsMarker:
+    """What the results area looked like before an action: its first card and active page."""
+
+    def __init__(self, first_card, page):
+        self.first_card = first_card
+        self.page = page
+
+    def replaced(self, state):
+        """True once the results area no longer shows the content captured by this marker.
+
+        The old first card being detached and re-rendered is the signal; when
+        there was no card (an empty or error page) any new content or a change
+        of the active page counts.
+        """
+        if self.first_card is not None:
+            return state["first"] != self.first_card
+        if state["first"] is not None or state["error"]:
+            return True
+        return self.page is not None and state["page"] is not None and state["page"] != self.page
+
+
+class PageWaiter:
+    """Waits for the portal's AJAX-rendered results instead of sleeping or polling for ``.card``.
+
+    Call ``mark()`` before the action that changes the results, then
+    ``wait_for_results(marker, ...)``: it returns once the old results were
+    replaced (the old first card was re-rendered or the active page changed), the
+    AJAX requests went idle and cards or the error banner are shown.
+    """
+
+    def __init__(self, driver, logger):
+        self.driver = driver
+        self.logger = logger
+        self.total_seconds = 0.0
+
+    def state(self):
+        return self.driver.execute_script(RESULTS_STATE_SCRIPT)
+
+    def mark(self):
+        state = self.state()
+        return ResultsMarker(state["first"], state["page"])
+
+    def wait_for_results(self, marker, label, timeouts=PAGE_TIMEOUT):
+        """Blocks until new results are rendered; returns the final results state."""
+        def settled(driver):
+            state = self.state()
+            if marker.replaced(state) and not state["pending"] and (state["first"] is not None or state["error"]):
+                return state
+            return False
+
+        return self._wait(settled, label, timeouts)
+
+    def reload_started(self, marker, within=RELOAD_START_SECONDS):
+        """True once an AJAX request is outstanding or the old results are gone, within ``within`` seconds.
+
+        Tells an action that re-runs the search from one the portal ignored,
+        without waiting out a full results timeout for the latter.
+        """
+        def started(driver):
+            state = self.state()
+            return bool(state["pending"]) or marker.replaced(state)
+
+        try:
+            WebDriverWait(self.driver, within, poll_frequency=POLL_INTERVAL).until(started)
+            return True
+        except TimeoutException:
+            return False
+
+    def wait_for_idle(self, label, timeouts=IDLE_TIMEOUT):
+        """Blocks until no jQuery AJAX request is outstanding."""
+        return self._wait(lambda driver: not self.state()["pending"], label, timeouts)
+
+    def _wait(self, condition, label, timeouts):
+        """Waits up to the learned timeout; a timed-out wait backs off and waits once more before raising."""
+        started = time.monotonic()
+        for attempt in (1, 2):
+            timeout = timeouts.timeout
+            try:
+                result = WebDriverWait(self.driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+                break
+            except TimeoutException:
+                timeouts.backoff()
+                if attempt == 2:
+                    self.logger.warning(f"Gave up waiting for {label} after {time.monotonic() - started:.1f}s.")
+                    raise
+                self.logger.warning(f"{label.capitalize()} not ready after {timeout:.1f}s; waiting up to {timeouts.timeout:.1f}s more.")
+        elapsed = time.monotonic() - started
+        timeouts.observe(elapsed)
+        self.total_seconds += elapsed
+        self.logger.info(f"Waited {elapsed:.2f}s for {label} (timeout {timeout:.1f}s).")
+        return result
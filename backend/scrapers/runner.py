@@ -0,0 +1,583 @@
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from scrapers.base import PortalError, ScrapeCancelled
+from scrapers.bid_details import get_bid_enricher
+from scrapers.card_extractors import EXTRACTORS
+from scrapers.checkpoint import Checkpoint, get_checkpoint_store
+from scrapers.engines import ENGINES, open_scraper
+from scrapers.sharding import SHARD_KINDS, ShardedScrape, get_shard_limiter
+from scrapers.states import INDIAN_STATES
+from utils.admission import AdmissionRejected, get_admission_controller
+from utils.bid_store import get_bid_store
+from utils.driver_setup import PROFILES
+from utils.metrics import COALESCED_SCRAPES, SCRAPE_SECONDS, SCRAPES_IN_FLIGHT
+from utils.result_cache import get_result_cache
+from utils.single_flight import SingleFlight
+from utils.timing import ScrapeTimings
+
+
+def parse_scrape_request(data):
+    """Validates a scrape payload from the API and returns the normalized parameters.
+
+    Raises ``ValueError`` with a client-facing message when the payload is invalid.
+    A payload with a ``resumeToken`` continues an incomplete scrape with that
+    scrape's parameters.
+    """
+    if not data:
+        raise ValueError("No input data provided")
+    if data.get('resumeToken'):
+        checkpoint = get_checkpoint_store().get(data['resumeToken'])
+        if checkpoint is None:
+            raise ValueError("Unknown or expired resumeToken")
+        return dict(
+            checkpoint.params,
+            resume_token=data['resumeToken'],
+            stream=bool(data.get('stream', False)),
+            timings=bool(data.get('timings', False)),
+        )
+    if not data.get('url'):
+        raise ValueError("URL is required")
+
+    try:
+        start_date = datetime.strptime(data.get('startDate'), '%Y-%m-%d')
+        # Set end_date to the end of the day to include all bids on that day
+        end_date = datetime.strptime(data.get('endDate'), '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid date format. Use YYYY-MM-DD")
+    if start_date > end_date:
+        raise ValueError("Start date cannot be after end date")
+
+    extraction = data.get('extraction', 'script')
+    if extraction not in EXTRACTORS:
+        raise ValueError(f"Invalid extraction strategy. Use one of: {', '.join(EXTRACTORS)}")
+    engine = data.get('engine', 'browser')
+    if engine not in ENGINES:
+        raise ValueError(f"Invalid engine. Use one of: {', '.join(ENGINES)}")
+
+    profile = data.get('profile')
+    if profile is not None and profile not in PROFILES:
+        raise ValueError(f"Invalid profile. Use one of: {', '.join(PROFILES)}")
+
+    try:
+        concurrency = int(data.get('concurrency', 1))
+    except (ValueError, TypeError):
+        raise ValueError("concurrency must be an integer")
+    max_concurrency = int(os.environ.get("SCRAPE_MAX_CONCURRENCY", 4))
+    if not 1 <= concurrency <= max_concurrency:
+        raise ValueError(f"concurrency must be between 1 and {max_concurrency}")
+    shard_by = data.get('shardBy', 'pages')
+    if shard_by not in SHARD_KINDS:
+        raise ValueError(f"Invalid shardBy. Use one of: {', '.join(SHARD_KINDS)}")
+    state, states = _parse_states(data)
+
+    return {
+        "state": state,
+        "states": states,
+        "start_date": start_date,
+        "end_date": end_date,
+        "engine": engine,
+        "extraction": extraction,
+        "profile": profile,
+        "concurrency": concurrency,
+        "shard_by": shard_by,
+        "no_cache": bool(data.get('noCache', False)),
+        "stream": bool(data.get('stream', False)),
+        "timings": bool(data.get('timings', False)),
+        "enrich": bool(data.get('enrich', False)),
+        "resume_token": None,
+    }
+
+
+def _parse_states(data):
+    """Returns ``(state, states)``: a single state filter, or the state list of a batch.
+
+    A batch is requested with a ``states`` list or with ``"all"`` as the
+    state(s); a one-element list is treated as a single state.
+    """
+    state = data.get('state')
+    states = data.get('states')
+    if any(isinstance(value, str) and value.strip().lower() == 'all' for value in (state, states)):
+        return None, list(INDIAN_STATES)
+    if states is None:
+        return state, None
+    if not isinstance(states, list) or not states or not all(isinstance(s, str) and s.strip() for s in states):
+        raise ValueError('states must be a non-empty list of state names or "all"')
+
+    known = {name.upper(): name for name in INDIAN_STATES}
+    unknown = [s for s in states if s.strip().upper() not in known]
+    if unknown:
+        raise ValueError(f"Unknown state(s): {', '.join(unknown)}")
+    names = list(dict.fromkeys(known[s.strip().upper()] for s in states))
+    if len(names) == 1:
+        return names[0], None
+    return None, names
+
+
+def run_scrape(params, logger, on_page=None, should_stop=None, background=False):
+    """Runs one scrape described by ``parse_scrape_request`` parameters.
+
+    Returns ``(bids, run_report)`` with the bids as ``Bid`` records. ``on_page(page_num, page_bids)`` is
+    called as results arrive (page 0 carries the bids served from the cache).
+    See ``scrape_events`` for coalescing, admission and ``background``.
+    """
+    all_bids = []
+    report = {}
+    for event, *payload in scrape_events(params, logger, should_stop=should_stop, background=background):
+        if event == "page":
+            page_num, page_bids = payload
+            all_bids.extend(page_bids)
+            if on_page:
+                on_page(page_num, page_bids)
+        else:
+            report = payload[0]
+    return all_bids, report
+
+
+_scrapes = SingleFlight()
+
+
+def scrape_events(params, logger, should_stop=None, background=False):
+    """Starts or joins a scrape and returns its ``iter_scrape`` events.
+
+    Requests with identical parameters (streamed or not) share one execution
+    while it runs: a request arriving mid-scrape replays the pages so far and
+    follows the rest, and its report is flagged ``coalesced``. The scrape
+    keeps running as long as any request follows it.
+
+    Browser scrapes that need a scraper session are admitted by the
+    admission controller first; this call blocks while they wait and raises
+    ``AdmissionRejected`` when they cannot be admitted. ``background``
+    callers (scrape jobs) wait for a session until ``should_stop()``. The
+    sessions are counted from the scrape's plan (see ``plan_scrape``), and
+    that same plan is what runs.
+    """
+    key = json.dumps({name: value for name, value in params.items() if name != "stream"}, sort_keys=True, default=str)
+    controller = get_admission_controller(logger)
+    # A request joining an identical scrape waits for it on its own terms, not its leader's.
+    wait = None if background else controller.max_wait
+    deadline = None if background else time.monotonic() + wait
+
+    planned = {}
+
+    def admit():
+        planned["checkpoint"] = plan_scrape(params, logger)
+        sessions = _browser_sessions(planned["checkpoint"])
+        if not sessions:
+            return None
+        timeout = None if background else max(0.0, deadline - time.monotonic())
+        return controller.acquire(sessions, background=background, should_stop=should_stop, timeout=timeout)
+
+    def produce(stop):
+        return iter_scrape(params, logger, should_stop=stop, checkpoint=planned["checkpoint"])
+
+    flight, leader = _scrapes.join(key, produce, admit, wait=wait, should_stop=should_stop)
+    if flight is None:
+        if should_stop and should_stop():
+            raise AdmissionRejected("Stopped while waiting for a browser session", 0)
+        raise controller.rejection(f"An identical scrape did not get a browser session within {wait:.3g}s")
+    if not leader:
+        COALESCED_SCRAPES.inc()
+        logger.info("Joined an identical scrape already in progress.")
+    return _follow(flight, leader, should_stop)
+
+
+def _follow(flight, leader, should_stop):
+    for event in flight.follow(should_stop):
+        if event[0] == "done":
+            yield event if leader else ("done", dict(event[1], coalesced=True))
+            return
+        yield event
+    raise ScrapeCancelled("Scrape cancelled")
+
+
+def _browser_sessions(checkpoint):
+    """Browser sessions the scrape of ``checkpoint`` will open at most.
+
+    None for the HTTP engine or when the result cache covers every day. A
+    sharded scrape opens one per shard, up to the per-host session limit;
+    anything else runs on a single session.
+    """
+    params = checkpoint.params
+    pending = checkpoint.pending()
+    if params["engine"] != "browser" or not pending:
+        return 0
+    sessions = min(params["concurrency"], get_shard_limiter().max_concurrent)
+    if params.get("states"):
+        # A batch shards by state only when more than one state is left to scrape.
+        return min(sessions, len(pending))
+    if params["shard_by"] == "states" and params.get("state"):
+        return 1
+    return sessions
+
+
+def plan_scrape(params, logger):
+    """Returns the checkpoint a scrape runs from, without redeeming a resume token.
+
+    A fresh scrape plans every state against the result cache; a resumed one
+    continues the plan saved under its token.
+    """
+    if params.get("resume_token"):
+        checkpoint = get_checkpoint_store().get(params["resume_token"])
+        if checkpoint is None:
+            raise ValueError("Unknown or expired resumeToken")
+        return checkpoint
+    cache = get_result_cache(logger)
+    states = params.get("states") or [params["state"]]
+    return Checkpoint(params, {
+        state: cache.plan(dict(params, state=state), bypass=params["no_cache"]) for state in states
+    })
+
+
+def iter_scrape(params, logger, should_stop=None, checkpoint=None):
+    """Streams one scrape: yields ``("page", page_num, page_bids)`` as results arrive,
+    then a final ``("done", run_report)``.
+
+    Days already in the result cache are served as page 0, in latest-first
+    order around the scraped pages, unless the request set ``noCache``; only
+    the uncovered days are scraped. Fresh bids are written to the bid store
+    page by page. Requests for several states run as one batch (see
+    ``_iter_batch``). Every scrape is timed per phase for ``/metrics``; the
+    report carries the breakdown when the request set ``timings``.
+
+    Portal errors are retried on a fresh session (see ``_iter_checkpointed``).
+    When the retries run out, the scrape ends with the bids collected so far
+    and an ``incomplete`` report with a ``resume_token``; a request with that
+    ``resumeToken`` serves those bids again as page 0 and scrapes only the rest.
+
+    With ``enrich`` set, every bid also gets the details of its bid document.
+    ``checkpoint`` is the scrape's plan when the caller already made it (see
+    ``plan_scrape``).
+    """
+    timings = ScrapeTimings(params["engine"])
+    SCRAPES_IN_FLIGHT.inc()
+    try:
+        events = _iter_scrape(params, logger, should_stop, timings, checkpoint)
+        if params.get("enrich"):
+            events = _iter_enriched(events, logger, timings)
+        for event in events:
+            if event[0] == "done" and params.get("timings"):
+                event = ("done", dict(event[1], timings=timings.summary()))
+            yield event
+    finally:
+        SCRAPES_IN_FLIGHT.dec()
+        SCRAPE_SECONDS.observe(time.monotonic() - timings.started, engine=params["engine"])
+
+
+def _iter_scrape(params, logger, should_stop, timings, checkpoint):
+    if params.get("resume_token"):
+        checkpoint = _resume(params, logger)
+        if checkpoint.delivered:
+            yield "page", 0, list(checkpoint.delivered)
+    elif checkpoint is None:
+        checkpoint = plan_scrape(params, logger)
+
+    report = {}
+    try:
+        if checkpoint.params.get("states"):
+            yield from _iter_batch(checkpoint, logger, should_stop, timings, report)
+        else:
+            yield from _iter_single(checkpoint, logger, should_stop, timings, report)
+    except PortalError as e:
+        yield "done", _interrupted(checkpoint, report, e, logger)
+        return
+    report.update(incomplete=False, retries=checkpoint.retries)
+    if checkpoint.resumed:
+        report["resumed"] = True
+    yield "done", report
+
+
+def _iter_enriched(events, logger, timings):
+    """Attaches bid-document details to the bids of every page; the report gains the document counts."""
+    enrichment = {}
+    done = []
+
+    def pages():
+        for event in events:
+            if event[0] == "page":
+                yield event[1], event[2]
+            else:
+                done.append(event[1])
+
+    for page_num, page_bids in get_bid_enricher(logger).iter_pages(pages(), enrichment, timings=timings):
+        yield "page", page_num, page_bids
+    yield "done", dict(done[0], enrichment=enrichment)
+
+
+def _resume(params, logger):
+    """Redeems the request's resume token and returns its checkpoint."""
+    token = params["resume_token"]
+    checkpoint = get_checkpoint_store().take(token)
+    if checkpoint is None:
+        raise ValueError("Unknown or expired resumeToken")
+    checkpoint.resumed = True
+    checkpoint.retries = 0
+    position = checkpoint.position()
+    logger.info(f"Resuming scrape at page {position['page']} (state: {position['state']}) "
+                f"with {len(checkpoint.delivered)} bid(s) already collected.")
+    return checkpoint
+
+
+def _interrupted(checkpoint, report, error, logger):
+    """Report of a scrape that gave up on a portal error; saves its checkpoint when it can be resumed."""
+    tracked = checkpoint.progress.values()
+    report.setdefault("pages_visited", sum(p["pages_visited"] for p in tracked))
+    report.setdefault("pages_with_bids", sum(p["pages_with_bids"] for p in tracked))
+    report.update(incomplete=True, error=str(error), retries=checkpoint.retries, resume_token=None)
+    if checkpoint.resumable and checkpoint.position():
+        report["resume_token"] = get_checkpoint_store().save(checkpoint)
+        report["resume_from"] = checkpoint.position()
+    if checkpoint.resumed:
+        report["resumed"] = True
+    logger.warning(f"Scrape incomplete with {len(checkpoint.delivered)} bid(s): {error}"
+                   + (" It can be resumed." if report["resume_token"] else ""))
+    return report
+
+
+def _iter_single(checkpoint, logger, should_stop, timings, report):
+    """Streams a single-state (or all-India) scrape: newer cached days, the scrape window, older cached days."""
+    (state, plan), = checkpoint.plans.items()
+    report["cache"] = plan.report()
+    if not checkpoint.resumed:
+        yield from _deliver(checkpoint, plan.cached_bids(newer=True))
+    if plan.window:
+        for page_num, page_bids in _iter_window(checkpoint, state, logger, should_stop, report, timings):
+            checkpoint.add_page(page_bids)
+            _store_bids(page_bids, state, logger)
+            yield "page", page_num, page_bids
+        _fill_cache(checkpoint, logger)
+        yield from _deliver(checkpoint, plan.cached_bids(newer=False))
+
+
+def _iter_batch(checkpoint, logger, should_stop, timings, report):
+    """Streams a multi-state scrape.
+
+    Each state is planned against the result cache on its own and its cached
+    days are served first; the states that still need scraping are then
+    searched one after another in a single scraper session, or spread over
+    several sessions when the request allows more than one. The report lists
+    the bids and timings of every state.
+    """
+    if not checkpoint.resumed:
+        for plan in checkpoint.plans.values():
+            yield from _deliver(checkpoint, plan.cached_bids(newer=True) + plan.cached_bids(newer=False))
+
+    try:
+        if checkpoint.pending():
+            for page_num, page_bids in _iter_states(checkpoint, logger, should_stop, report, timings):
+                checkpoint.add_page(page_bids)
+                _store_bids(page_bids, None, logger)
+                yield "page", page_num, page_bids
+    finally:
+        # States finished before a failure are cached and reported all the same.
+        _fill_cache(checkpoint, logger)
+        scraped = report.pop("states", {})
+        plans = checkpoint.plans
+        cache_reports = [plan.report() for plan in plans.values()]
+        report.update(
+            states=[
+                dict(scraped.get(state, {}), state=state, cache=plans[state].report(),
+                     bids=len(plans[state].cached_bids(newer=True) + plans[state].cached_bids(newer=False))
+                     + len(checkpoint.fresh.get(state, [])))
+                for state in plans
+            ],
+            cache={
+                "days": sum(r["days"] for r in cache_reports),
+                "hits": sum(r["hits"] for r in cache_reports),
+                "misses": sum(r["misses"] for r in cache_reports),
+                "bypassed": checkpoint.params["no_cache"],
+            },
+        )
+
+
+def _deliver(checkpoint, bids):
+    if bids:
+        checkpoint.deliver(bids)
+        yield "page", 0, bids
+
+
+def _fill_cache(checkpoint, logger):
+    """Caches the scraped days of every finished state, once."""
+    cache = get_result_cache(logger)
+    for state, progress in checkpoint.progress.items():
+        if progress["done"] and not progress.get("cached"):
+            cache.fill(checkpoint.plans[state], checkpoint.fresh[state])
+            progress["cached"] = True
+
+
+def _iter_states(checkpoint, logger, should_stop, report, timings):
+    """Yields ``(page_num, page_bids)`` for each pending state; ``report["states"]`` maps
+    every scraped state to its page counts and seconds.
+
+    A single session re-runs the consignee search per state on the already
+    loaded advance-search page instead of starting over for each one.
+    """
+    params = checkpoint.params
+    windows = checkpoint.pending()
+    if params["concurrency"] > 1 and len(windows) > 1:
+        # Shards finish pages out of order, so there is no single page to resume from.
+        checkpoint.resumable = False
+        batch = dict(params, state=None, states=list(windows), windows=windows, shard_by="states")
+        try:
+            yield from _iter_sharded(batch, logger, should_stop, report, timings)
+        finally:
+            # Only a state whose shard completed has a report; those are done even when another shard failed.
+            report["states"] = {r["state"]: r for r in report.pop("shard_reports", [])}
+            for state in report["states"]:
+                checkpoint.state_done(state)
+        return
+
+    yield from _iter_checkpointed(checkpoint, logger, should_stop, timings)
+    states_report = {state: checkpoint.state_report(state) for state in checkpoint.progress}
+    report.update(
+        pages_visited=sum(r["pages_visited"] for r in states_report.values()),
+        pages_with_bids=sum(r["pages_with_bids"] for r in states_report.values()),
+        states=states_report,
+    )
+
+
+def _store_bids(bids, state, logger):
+    if not bids:
+        return
+    try:
+        get_bid_store().upsert(bids, state=state)
+    except Exception as e:
+        logger.error(f"Could not write bids to the bid store: {e}")
+
+
+def _iter_window(checkpoint, state, logger, should_stop, report, timings):
+    """Yields ``(page_num, page_bids)`` for one state's date window and fills ``report`` when done.
+
+    Requests with a concurrency above one are split into shards that run on
+    several scraper sessions at once.
+    """
+    window = checkpoint.plans[state].window
+    if window["concurrency"] > 1:
+        checkpoint.resumable = False
+        yield from _iter_sharded(window, logger, should_stop, report, timings)
+        checkpoint.state_done(state)
+        return
+
+    logger.info(f"Starting to scrape bids from {window['start_date']:%Y-%m-%d} to {window['end_date']:%Y-%m-%d}...")
+    yield from _iter_checkpointed(checkpoint, logger, should_stop, timings)
+    report.update(checkpoint.state_report(state))
+
+
+def _iter_checkpointed(checkpoint, logger, should_stop, timings):
+    """Yields ``(page_num, page_bids)`` for every pending state of ``checkpoint`` on one scraper session.
+
+    When the portal fails, the session is discarded and, after an exponential
+    backoff, a fresh one repeats the search and jumps straight back to the page
+    that failed. ``SCRAPE_PORTAL_RETRIES`` bounds the retries per scrape; the
+    last ``PortalError`` is raised once they run out.
+    """
+    params = checkpoint.params
+    retries = int(os.environ.get("SCRAPE_PORTAL_RETRIES", 2))
+    backoff = float(os.environ.get("SCRAPE_RETRY_BACKOFF", 2))
+    max_backoff = float(os.environ.get("SCRAPE_RETRY_BACKOFF_MAX", 60))
+    while checkpoint.pending():
+        try:
+            with open_scraper(params["engine"], logger, extraction=params["extraction"],
+                              profile=params.get("profile"), timings=timings) as scraper:
+                logger.info("Loading page...")
+                scraper.load_page()
+                pending = checkpoint.pending()
+                for number, (state, window) in enumerate(pending.items(), start=1):
+                    progress = checkpoint.progress[state]
+                    started = time.monotonic()
+                    try:
+                        logger.info(f"Applying filters and searching (state {number}/{len(pending)}: {state})...")
+                        scraper.apply_filters_and_search(state=state, start_date=window["start_date"])
+                        for page_num, page_bids in scraper.iter_bids(
+                            start_date=window["start_date"],
+                            end_date=window["end_date"],
+                            should_stop=should_stop,
+                            start_page=progress["next_page"],
+                        ):
+                            checkpoint.page_done(state, page_num, page_bids)
+                            yield page_num, page_bids
+                    finally:
+                        progress["seconds"] += time.monotonic() - started
+                    checkpoint.state_done(state, scraper.run_report)
+        except PortalError as e:
+            if checkpoint.retries >= retries:
+                raise
+            checkpoint.retries += 1
+            delay = min(backoff * 2 ** (checkpoint.retries - 1), max_backoff)
+            position = checkpoint.position()
+            logger.warning(f"{e} Retrying from page {position['page']} (state: {position['state']}) "
+                           f"on a new session in {delay:.1f}s (retry {checkpoint.retries}/{retries}).")
+            _sleep(delay, should_stop)
+
+
+def _sleep(seconds, should_stop):
+    """Sleeps between retries, waking early to honour a cancellation."""
+    deadline = time.monotonic() + seconds
+    while True:
+        if should_stop and should_stop():
+            raise ScrapeCancelled("Scrape cancelled while waiting to retry")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, 0.5))
+
+
+_SHARDS_DONE = object()
+
+
+def _iter_sharded(params, logger, should_stop, report, timings):
+    """Runs a sharded scrape on a helper thread and relays its pages as they complete.
+
+    A bid number already relayed for the same state is dropped from later
+    pages (shards can overlap when the listing shifts while they run);
+    ``report["duplicates_removed"]`` counts the dropped bids. A bid listed
+    under several states of a batch is kept for each. When a shard fails,
+    ``report["shard_reports"]`` still lists the shards that completed.
+    """
+    pages = queue.Queue()
+    abandoned = threading.Event()
+    seen = set()
+    duplicates = 0
+
+    def stop_requested():
+        return abandoned.is_set() or bool(should_stop and should_stop())
+
+    def run():
+        sharded = None
+        try:
+            sharded = ShardedScrape(params, logger, concurrency=params["concurrency"], shard_by=params["shard_by"],
+                                    timings=timings)
+            _, shard_report = sharded.run(on_page=lambda page_num, page_bids: pages.put((page_num, page_bids)),
+                                          should_stop=stop_requested)
+            report.update(shard_report)
+            pages.put(_SHARDS_DONE)
+        except Exception as e:
+            if sharded is not None:
+                report["shard_reports"] = sharded.finished_reports()
+            pages.put(e)
+
+    threading.Thread(target=run, name="sharded-scrape", daemon=True).start()
+    try:
+        while True:
+            item = pages.get()
+            if item is _SHARDS_DONE:
+                report["duplicates_removed"] = duplicates
+                return
+            if isinstance(item, Exception):
+                raise item
+            page_num, page_bids = item
+            unique = []
+            for bid in page_bids:
+                key = (bid.state, bid.bid_number)
+                if bid.bid_number is not None and key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+                unique.append(bid)
+            yield page_num, unique
+    finally:
+        # Stops the shards if the consumer goes away early.
+        abandoned.set()
@@ -0,0 +1,221 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from scrapers.base import BASE_URL
+from scrapers.engines import open_scraper
+from scrapers.states import INDIAN_STATES
+from utils.driver_pool import DriverPoolExhausted
+from utils.rate_limit import get_host_limiter
+
+SHARD_KINDS = ("pages", "states")
+
+
+def get_shard_limiter():
+    """The politeness limit on sessions and page rate shared by every sharded scrape of the portal."""
+    return get_host_limiter(
+        BASE_URL,
+        max_concurrent=int(os.environ.get("SCRAPE_HOST_CONCURRENCY", 2)),
+        rate=float(os.environ.get("SCRAPE_HOST_PAGES_PER_SECOND", 2)),
+    )
+
+
+def split_pages(page_count, concurrency):
+    """Splits pages 1..page_count into one contiguous ``(start_page, max_pages)`` range per session.
+
+    Every range costs a search of its own, so there are no more of them than
+    sessions. The last range is open-ended (``max_pages`` None) and also
+    covers pages listed after the count was taken.
+    """
+    size = max(1, -(-page_count // concurrency))
+    ranges = [(start, size) for start in range(1, page_count + 1, size)]
+    ranges[-1] = (ranges[-1][0], None)
+    return ranges
+
+
+def merge_bids(shard_results):
+    """Concatenates per-shard bids in shard order, dropping repeated bid numbers.
+
+    Returns ``(bids, duplicates_removed)``.
+    """
+    seen = set()
+    merged = []
+    duplicates = 0
+    for bids in shard_results:
+        for bid in bids:
+            bid_number = bid.bid_number
+            if bid_number is not None and bid_number in seen:
+                duplicates += 1
+                continue
+            seen.add(bid_number)
+            merged.append(bid)
+    return merged, duplicates
+
+
+class ShardedScrape:
+    """Splits one logical scrape into shards and runs them concurrently, one scraper session per worker.
+
+    Shards are either page ranges of a single search (``pages``) or one search
+    per state (``states``: the request's ``states`` list, else its ``state``,
+    else every state). Each state shard may carry its own date window through
+    ``params["windows"]``. Workers share a per-host politeness limit on
+    concurrent sessions and page rate.
+    """
+
+    def __init__(self, params, logger, concurrency=2, shard_by="pages", timings=None):
+        if shard_by not in SHARD_KINDS:
+            raise ValueError(f"Unknown shard kind '{shard_by}'. Choose one of: {', '.join(SHARD_KINDS)}")
+        self.params = params
+        self.logger = logger
+        self.shard_by = shard_by
+        self.timings = timings
+        self.limiter = get_shard_limiter()
+        self.concurrency = max(1, min(concurrency, self.limiter.max_concurrent))
+        self._shards = queue.Queue()
+        self._results = {}
+        self._reports = {}
+        self._cutoff_page = None
+        self._lock = threading.Lock()
+
+    def run(self, on_page=None, should_stop=None):
+        """Runs every shard and returns ``(bids, report)`` like a single scrape."""
+        self._on_page = on_page
+        self._should_stop = should_stop
+        started = time.monotonic()
+
+        if self.shard_by == "states":
+            state = self.params.get("state")
+            states = self.params.get("states") or ([state] if state else list(INDIAN_STATES))
+            for index, shard_state in enumerate(states):
+                self._shards.put((index, {"state": shard_state}))
+            self._run_workers(min(self.concurrency, len(states)))
+            if not self._shards.empty():
+                raise DriverPoolExhausted("No scraper session could be started for the remaining shards")
+        else:
+            self._run_page_shards()
+
+        ordered = [self._results[index] for index in sorted(self._results)]
+        bids, duplicates = merge_bids(ordered)
+        reports = [self._reports[index] for index in sorted(self._reports)]
+        report = {
+            "shard_by": self.shard_by,
+            "shards": len(reports),
+            "concurrency": self.concurrency,
+            "pages_visited": sum(r.get("pages_visited", 0) for r in reports),
+            "pages_with_bids": sum(r.get("pages_with_bids", 0) for r in reports),
+            "duplicates_removed": duplicates,
+            "seconds": round(time.monotonic() - started, 2),
+            "shard_reports": reports,
+        }
+        self.logger.info(f"Sharded scrape finished: {len(bids)} bids from {len(reports)} shard(s) in {report['seconds']}s.")
+        return bids, report
+
+    def finished_reports(self):
+        """Reports of the shards completed so far, in shard order; still valid after ``run`` failed."""
+        with self._lock:
+            return [self._reports[index] for index in sorted(self._reports)]
+
+    def _run_page_shards(self):
+        """Counts the result pages in a first session, then fans the page ranges out.
+
+        When the portal does not tell the page count, the first session scrapes
+        every page on its own.
+        """
+        with self.limiter.session():
+            with open_scraper(self.params["engine"], self.logger, extraction=self.params["extraction"],
+                              profile=self.params.get("profile"), timings=self.timings) as scraper:
+                scraper.load_page()
+                self._search(scraper, self.params.get("state"), self.params["start_date"])
+                page_count = scraper.page_count()
+                if page_count:
+                    ranges = split_pages(page_count, self.concurrency)
+                    self.logger.info(f"Sharding {page_count} page(s) into {len(ranges)} range(s) across {self.concurrency} session(s).")
+                else:
+                    ranges = [(1, None)]
+                    self.logger.info("The number of result pages is unknown; scraping them on one session.")
+                for index, (start_page, max_pages) in enumerate(ranges):
+                    self._shards.put((index, {"state": self.params.get("state"), "start_page": start_page, "max_pages": max_pages}))
+
+                helpers = min(self.concurrency, self.limiter.max_concurrent, len(ranges)) - 1
+                executor = ThreadPoolExecutor(max_workers=helpers) if helpers else None
+                futures = [executor.submit(self._worker) for _ in range(helpers)] if executor else []
+                try:
+                    # The first range runs on the session that already holds the search.
+                    self._drain(scraper, fresh_search=True)
+                finally:
+                    if executor:
+                        executor.shutdown(wait=True)
+                for future in futures:
+                    future.result()
+
+    def _run_workers(self, workers):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._worker) for _ in range(workers)]
+        for future in futures:
+            future.result()
+
+    def _worker(self):
+        with self.limiter.session(), ExitStack() as stack:
+            if self._shards.empty():
+                return
+            try:
+                scraper = stack.enter_context(
+                    open_scraper(self.params["engine"], self.logger, extraction=self.params["extraction"],
+                                 profile=self.params.get("profile"), timings=self.timings)
+                )
+            except DriverPoolExhausted as e:
+                # The shards stay queued for the sessions that did start.
+                self.logger.warning(f"Shard worker could not get a browser: {e}")
+                return
+            scraper.load_page()
+            self._drain(scraper)
+
+    def _drain(self, scraper, fresh_search=False):
+        """Runs queued shards on one scraper session until the queue is empty.
+
+        ``fresh_search`` means the session's current results are page 1 of the
+        shard search, so the first page-1 shard needs no new search.
+        """
+        while True:
+            try:
+                index, shard = self._shards.get_nowait()
+            except queue.Empty:
+                return
+            start_page = shard.get("start_page", 1)
+            if self._cutoff_page is not None and start_page > self._cutoff_page:
+                continue
+            window = self.params.get("windows", {}).get(shard["state"], self.params)
+            if not (fresh_search and start_page == 1):
+                self._search(scraper, shard["state"], window["start_date"])
+            fresh_search = False
+
+            started = time.monotonic()
+            bids = scraper.scrape_bids(
+                start_date=window["start_date"],
+                end_date=window["end_date"],
+                on_page=self._page_done,
+                should_stop=self._should_stop,
+                start_page=start_page,
+                max_pages=shard.get("max_pages"),
+            )
+            report = dict(scraper.run_report, state=shard["state"], start_page=start_page, bids=len(bids),
+                          seconds=round(time.monotonic() - started, 2))
+            with self._lock:
+                self._results[index] = bids
+                self._reports[index] = report
+                if report.get("stopped_early"):
+                    last_page = start_page + report["pages_visited"] - 1
+                    if self._cutoff_page is None or last_page < self._cutoff_page:
+                        self._cutoff_page = last_page
+
+    def _search(self, scraper, state, start_date):
+        self.limiter.pace()
+        scraper.apply_filters_and_search(state=state, start_date=start_date)
+
+    def _page_done(self, page_num, page_bids):
+        if self._on_page:
+            with self._lock:
+                self._on_page(page_num, page_bids)
+        self.limiter.pace()
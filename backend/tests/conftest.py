@@ -0,0 +1,60 @@
+import os
+import pytest
+
+# Read once when the per-host limiter is created; the fixture portal needs no politeness delay.
+os.environ["SCRAPE_HOST_PAGES_PER_SECOND"] = "100"
+
+from fixtures.gem_server import GemFixtureServer  # noqa: E402
+from scrapers import bid_details, checkpoint  # noqa: E402
+from utils import admission, bid_store, result_cache  # noqa: E402
+
+SINGLETONS = (
+    (result_cache, "_cache"),
+    (checkpoint, "_store"),
+    (bid_store, "_store"),
+    (bid_details, "_enricher"),
+    (admission, "_controller"),
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """Every test gets its own result cache, checkpoints, bid store and admission controller."""
+    monkeypatch.setenv("BID_STORE_PATH", str(tmp_path / "bids.sqlite3"))
+    monkeypatch.setenv("BID_DETAIL_CACHE_DIR", str(tmp_path / "bid_documents"))
+    monkeypatch.setenv("SCRAPE_RETRY_BACKOFF", "0.01")
+    for module, name in SINGLETONS:
+        monkeypatch.setattr(module, name, None)
+
+
+@pytest.fixture
+def gem_server(monkeypatch):
+    """Starts a fixture portal (``GemFixtureServer`` arguments) and points the HTTP engine at it."""
+    servers = []
+
+    def start(**kwargs):
+        server = GemFixtureServer(**kwargs).start()
+        servers.append(server)
+        monkeypatch.setenv("GEM_BASE_URL", server.url)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def client():
+    from app import app
+    return app.test_client()
+
+
+@pytest.fixture
+def scrape(client):
+    """Posts a scrape of the fixture portal over the HTTP engine; keyword arguments override the payload."""
+    def post(**payload):
+        body = {"url": "https://bidplus.gem.gov.in", "startDate": "2025-06-01", "endDate": "2025-06-30",
+                "state": "ANDHRA PRADESH", "engine": "http", "noCache": True}
+        body.update(payload)
+        return client.post("/scrape", json=body)
+    return post
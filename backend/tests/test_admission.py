@@ -0,0 +1,52 @@
+import logging
+from scrapers.runner import _browser_sessions, parse_scrape_request, plan_scrape
+from utils import admission
+from utils.admission import AdmissionController, session_capacity
+from utils.memory import SessionMemory
+
+MIB = 2 ** 20
+
+
+def sessions(**payload):
+    body = {"url": "https://bidplus.gem.gov.in", "startDate": "2025-06-29", "endDate": "2025-06-30",
+            "state": "GOA", "engine": "browser"}
+    body.update(payload)
+    params = parse_scrape_request(body)
+    return _browser_sessions(plan_scrape(params, logging.getLogger(__name__)))
+
+
+def test_sessions_follow_what_the_scrape_opens(monkeypatch):
+    monkeypatch.setenv("SCRAPE_MAX_CONCURRENCY", "4")
+    assert sessions() == 1
+    assert sessions(engine="http", concurrency=2) == 0
+    # Sharded scrapes are held to the per-host session limit (2 by default).
+    assert sessions(concurrency=4) == 2
+    assert sessions(concurrency=4, shardBy="states") == 1
+    assert sessions(state="all", concurrency=4, shardBy="states") == 2
+    assert sessions(states=["GOA", "ASSAM", "BIHAR"]) == 1
+    assert sessions(states=["GOA", "ASSAM", "BIHAR"], concurrency=2) == 2
+
+
+def test_warm_browsers_count_against_memory():
+    memory = SessionMemory(default=400 * MIB)
+    assert session_capacity(8, 512 * MIB, 2512 * MIB, memory) == 5
+    assert session_capacity(8, 512 * MIB, 2512 * MIB, memory, warm_browsers=lambda: 2) == 3
+    assert session_capacity(8, 512 * MIB, None, memory, warm_browsers=lambda: 2) == 8
+
+
+def test_cached_browser_request_needs_no_session(gem_server, scrape, monkeypatch):
+    gem_server(pages=2)
+    scrape(startDate="2025-06-29", noCache=False)
+    controller = AdmissionController(lambda: 1, max_queued=0, max_wait=0.2)
+    monkeypatch.setattr(admission, "_controller", controller)
+    release = controller.acquire()
+    try:
+        cached = scrape(startDate="2025-06-29", engine="browser", noCache=False)
+        assert cached.status_code == 200
+        assert cached.get_json()["report"]["cache"]["misses"] == 0
+
+        uncached = scrape(startDate="2025-06-29", engine="browser")
+        assert uncached.status_code == 429
+        assert int(uncached.headers["Retry-After"]) >= 1
+    finally:
+        release()
@@ -0,0 +1,22 @@
+from scrapers.bid import Bid, parse_portal_date
+
+CARD = {
+    "bid_number": "GEM/2025/B/6400000",
+    "href": "/showbidDocument/7300000",
+    "items": " Office Chair ",
+    "quantity": "Quantity: 1,200 Nos",
+    "department": "Ministry of Defence\nDepartment of Military Affairs",
+    "start_date": "30-06-2025 10:15 AM\nIST",
+    "end_date": "10-07-2025 11:00 AM",
+}
+
+
+def test_to_dict_returns_the_portal_text():
+    bid = Bid.from_card(CARD, parse_portal_date(CARD["start_date"]), state="GOA")
+    data = bid.to_dict()
+    assert data["start_date"] == "30-06-2025 10:15 AM\nIST"
+    assert data["end_date"] == "10-07-2025 11:00 AM"
+    assert data["quantity"] == "1,200 Nos"
+    assert bid.quantity is None
+    assert data["items"] == "Office Chair"
+    assert data["bid_url"] == "https://bidplus.gem.gov.in/showbidDocument/7300000"
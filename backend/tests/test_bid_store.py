@@ -0,0 +1,25 @@
+from datetime import datetime
+from scrapers.bid import Bid
+from utils.bid_store import BidStore
+
+
+def bid(number, department, items="Office Chair"):
+    return Bid(number, None, items, 1, department, datetime(2025, 6, 30, 10), datetime(2025, 7, 10), state="GOA")
+
+
+def test_filters_match_wildcards_literally(tmp_path):
+    store = BidStore(str(tmp_path / "bids.sqlite3"))
+    store.upsert([bid("B-1", "A_B Works"), bid("B-2", "AXB Works"), bid("B-3", "100% Cotton Mills", items="Cotton_Wool")])
+
+    def numbers(**filters):
+        return sorted(row["bid_number"] for row in store.query(**filters)[0])
+
+    assert numbers(department="a_b") == ["B-1"]
+    assert numbers(department="%") == []
+    assert numbers(department="100%") == ["B-3"]
+    assert numbers(department="ax") == ["B-2"]
+
+    # The text search falls back to LIKE when SQLite has no FTS5.
+    store.full_text = False
+    assert numbers(text="n_w") == ["B-3"]
+    assert numbers(text="x%") == []
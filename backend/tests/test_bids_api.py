@@ -0,0 +1,29 @@
+def test_bids_pages_through_every_stored_bid(gem_server, scrape, client):
+    gem_server(pages=3)
+    scraped = scrape().get_json()["data"]
+
+    seen, cursor = [], None
+    while True:
+        query = {"limit": 7, "cursor": cursor} if cursor else {"limit": 7}
+        page = client.get("/bids", query_string=query).get_json()
+        assert page["count"] == len(page["data"]) <= 7
+        seen.extend(bid["bid_number"] for bid in page["data"])
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+
+    assert seen == [bid["bid_number"] for bid in scraped]
+
+
+def test_bids_filters_by_department_prefix(gem_server, scrape, client):
+    gem_server(pages=1)
+    scraped = scrape().get_json()["data"]
+    department = scraped[0]["department"]
+
+    page = client.get("/bids", query_string={"department": department[:8].lower()}).get_json()
+    assert page["data"]
+    assert all(bid["department"].lower().startswith(department[:8].lower()) for bid in page["data"])
+
+
+def test_bids_rejects_a_bad_cursor(client):
+    assert client.get("/bids", query_string={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,58 @@
+import threading
+import time
+import pytest
+from utils.driver_pool import DriverPool, DriverPoolExhausted
+
+
+class FakeDriver:
+    def __init__(self, reset_started=None, reset_released=None):
+        self.quits = 0
+        self.reset_started = reset_started
+        self.reset_released = reset_released
+
+    def execute_script(self, script):
+        if self.quits:
+            raise RuntimeError("The browser has quit")
+
+    def delete_all_cookies(self):
+        if self.reset_started:
+            self.reset_started.set()
+            self.reset_released.wait(2)
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quits += 1
+
+
+def test_close_quits_idle_and_checked_out_drivers():
+    pool = DriverPool(factory=FakeDriver, size=2, min_idle=0, reset_url=None)
+    idle = pool.acquire()
+    pool.release(idle)
+    busy = pool.acquire()
+    assert busy is idle
+    other = pool.acquire()
+
+    pool.close()
+    assert busy.quits == 1 and other.quits == 1
+    # Releasing after shutdown neither quits again nor brings the driver back.
+    pool.release(busy)
+    assert busy.quits == 1
+    assert pool.stats() == {"size": 2, "idle": 0, "in_use": 0, "starting": 0, "resetting": 0}
+    with pytest.raises(DriverPoolExhausted):
+        pool.acquire(timeout=0)
+
+
+def test_close_quits_a_driver_being_reset():
+    started, released = threading.Event(), threading.Event()
+    pool = DriverPool(factory=lambda: FakeDriver(started, released), size=1, min_idle=0, reset_url=None)
+    driver = pool.acquire()
+    pool.release(driver)
+    assert started.wait(2)
+
+    pool.close()
+    assert driver.quits == 1
+    released.set()
+    time.sleep(0.1)
+    assert driver.quits == 1
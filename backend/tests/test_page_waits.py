@@ -0,0 +1,34 @@
+import logging
+from scrapers import page_waits
+from scrapers.gem_scraper import SORT_BY_START_DATE_SCRIPT, GemBidScraper
+from scrapers.page_waits import RESULTS_STATE_SCRIPT
+
+
+class FakeDriver:
+    """Answers the sort script with "changed" and shows the results states queued in ``states``."""
+
+    def __init__(self, states):
+        self.states = states
+
+    def execute_script(self, script, *args):
+        if script == SORT_BY_START_DATE_SCRIPT:
+            return "changed"
+        assert script == RESULTS_STATE_SCRIPT
+        return self.states.pop(0) if len(self.states) > 1 else self.states[0]
+
+
+def results(first, pending=0):
+    return {"first": first, "page": 1, "pending": pending, "error": False}
+
+
+def test_sort_that_does_not_search_again_is_not_waited_for():
+    timeout = page_waits.SEARCH_TIMEOUT.timeout
+    scraper = GemBidScraper(FakeDriver([results("card-1")]), logging.getLogger(__name__))
+    assert scraper._sort_by_start_date() is False
+    assert page_waits.SEARCH_TIMEOUT.timeout == timeout
+
+
+def test_sort_that_searches_again_waits_for_the_new_results():
+    driver = FakeDriver([results("card-1"), results("card-1", pending=1), results("card-2")])
+    scraper = GemBidScraper(driver, logging.getLogger(__name__))
+    assert scraper._sort_by_start_date() is True
@@ -0,0 +1,54 @@
+from datetime import date, datetime
+from scrapers.bid import Bid
+from utils.result_cache import DayCache
+
+
+def params(start, end, state="GOA"):
+    return {"state": state, "start_date": datetime.strptime(start, "%Y-%m-%d"),
+            "end_date": datetime.strptime(end, "%Y-%m-%d").replace(hour=23, minute=59, second=59)}
+
+
+def bid(number, start_at):
+    return Bid(number, None, "Items", 1, "Department", start_at, datetime(2025, 7, 10), state="GOA")
+
+
+def test_plan_scrapes_only_the_uncached_days():
+    cache = DayCache()
+    plan = cache.plan(params("2025-06-01", "2025-06-02"))
+    assert plan.window["start_date"] == datetime(2025, 6, 1)
+    assert plan.scraped_days == [date(2025, 6, 1), date(2025, 6, 2)]
+    cache.fill(plan, [bid("B-2", datetime(2025, 6, 2, 10)), bid("B-1", datetime(2025, 6, 1, 9))])
+
+    plan = cache.plan(params("2025-06-01", "2025-06-04"))
+    assert plan.scraped_days == [date(2025, 6, 3), date(2025, 6, 4)]
+    assert plan.window["start_date"] == datetime(2025, 6, 3)
+    assert [b.bid_number for b in plan.cached_bids(newer=False)] == ["B-2", "B-1"]
+    assert plan.report() == {"days": 4, "hits": 2, "misses": 2, "bypassed": False}
+
+
+def test_fully_cached_request_needs_no_scrape():
+    cache = DayCache()
+    plan = cache.plan(params("2025-06-01", "2025-06-01"))
+    cache.fill(plan, [])
+
+    plan = cache.plan(params("2025-06-01", "2025-06-01"))
+    assert plan.window is None
+    assert plan.cached_bids() == []
+    assert cache.plan(params("2025-06-01", "2025-06-01", state="ASSAM")).window is not None
+
+
+def test_bypass_rescrapes_cached_days():
+    cache = DayCache()
+    cache.fill(cache.plan(params("2025-06-01", "2025-06-01")), [])
+    assert cache.plan(params("2025-06-01", "2025-06-01"), bypass=True).window is not None
+
+
+def test_second_request_is_served_from_the_cache(gem_server, scrape):
+    server = gem_server(pages=3)
+    first = scrape(startDate="2025-06-29", noCache=False).get_json()
+    served = server.requests_served
+
+    second = scrape(startDate="2025-06-29", noCache=False).get_json()
+    assert server.requests_served == served
+    assert second["data"] == first["data"]
+    assert second["report"]["cache"]["hits"] == 2
@@ -0,0 +1,45 @@
+def bid_numbers(response):
+    return [bid["bid_number"] for bid in response.get_json()["data"]]
+
+
+def test_failed_scrape_resumes_where_it_stopped(gem_server, scrape):
+    server = gem_server(pages=5)
+    expected = bid_numbers(scrape())
+    assert len(expected) == 50
+
+    server.error_pages = {3}
+    partial = scrape().get_json()
+    assert partial["incomplete"] is True
+    assert partial["resumeToken"]
+    assert len(partial["data"]) == 20
+
+    server.error_pages = set()
+    resumed = scrape(resumeToken=partial["resumeToken"])
+    assert resumed.status_code == 200
+    assert "incomplete" not in resumed.get_json()
+    assert bid_numbers(resumed) == expected
+
+
+def test_resume_token_is_used_up(gem_server, scrape):
+    server = gem_server(pages=3, error_pages={2})
+    token = scrape().get_json()["resumeToken"]
+
+    server.error_pages = set()
+    assert scrape(resumeToken=token).status_code == 200
+    reused = scrape(resumeToken=token)
+    assert reused.status_code == 400
+    assert reused.get_json()["error"] == "Unknown or expired resumeToken"
+
+
+def test_batch_resumes_only_the_unfinished_states(gem_server, scrape):
+    server = gem_server(pages=3)
+    states = ["ANDHRA PRADESH", "GOA", "ASSAM"]
+    expected = sorted((bid["state"], bid["bid_number"]) for bid in scrape(states=states).get_json()["data"])
+
+    server.error_pages = {2}
+    partial = scrape(states=states).get_json()
+    assert partial["incomplete"] is True
+
+    server.error_pages = set()
+    resumed = scrape(resumeToken=partial["resumeToken"]).get_json()
+    assert sorted((bid["state"], bid["bid_number"]) for bid in resumed["data"]) == expected
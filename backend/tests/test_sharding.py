@@ -0,0 +1,71 @@
+from scrapers.gem_http_scraper import GemHttpScraper
+from scrapers.sharding import split_pages
+from scrapers.states import INDIAN_STATES
+
+
+def keys(response):
+    return [(bid["state"], bid["bid_number"]) for bid in response.get_json()["data"]]
+
+
+def test_split_pages_gives_each_session_one_range():
+    for page_count in range(1, 20):
+        for concurrency in range(1, 5):
+            ranges = split_pages(page_count, concurrency)
+            assert len(ranges) <= concurrency
+            assert ranges[-1][1] is None
+            pages = [page for start, count in ranges for page in range(start, start + (count or page_count))]
+            assert pages[:page_count] == list(range(1, page_count + 1))
+
+
+def test_page_shards_return_the_unsharded_bids(gem_server, scrape):
+    gem_server(pages=6)
+    expected = sorted(keys(scrape()))
+
+    # Shards report their pages as they finish, so only the set of bids is comparable.
+    sharded = scrape(concurrency=2)
+    assert sorted(keys(sharded)) == expected
+    assert sharded.get_json()["report"]["shards"] > 1
+
+
+def test_page_shards_without_a_page_count_scrape_every_page(gem_server, scrape, monkeypatch):
+    gem_server(pages=6)
+    monkeypatch.setattr(GemHttpScraper, "page_count", lambda self: None)
+
+    sharded = scrape(concurrency=2).get_json()
+    assert len(sharded["data"]) == 60
+    assert "incomplete" not in sharded
+
+
+def test_state_shards_return_every_state(gem_server, scrape):
+    gem_server(pages=2)
+    states = ["ANDHRA PRADESH", "GOA", "ASSAM"]
+    expected = sorted(keys(scrape(states=states)))
+
+    sharded = scrape(states=states, concurrency=2, shardBy="states")
+    assert sorted(keys(sharded)) == expected
+    assert {bid["state"] for bid in sharded.get_json()["data"]} == set(states)
+
+
+def test_all_india_state_shards_are_cached_as_one_scope(gem_server, scrape):
+    server = gem_server(pages=1)
+    sharded = scrape(state=None, concurrency=2, shardBy="states", startDate="2025-06-30", noCache=False)
+    assert sharded.status_code == 200
+    assert len(sharded.get_json()["data"]) == len(INDIAN_STATES) * 10
+
+    served = server.requests_served
+    cached = scrape(state=None, concurrency=2, shardBy="states", startDate="2025-06-30", noCache=False)
+    assert server.requests_served == served
+    assert sorted(keys(cached)) == sorted(keys(sharded))
+
+
+def test_state_shards_finished_before_a_failure_are_cached(gem_server, scrape):
+    server = gem_server(pages=2, error_states={"GOA"})
+    failed = scrape(states=["ANDHRA PRADESH", "GOA", "ASSAM"], concurrency=2, shardBy="states", noCache=False)
+    assert failed.get_json()["incomplete"] is True
+
+    served = server.requests_served
+    for state in ("ANDHRA PRADESH", "ASSAM"):
+        cached = scrape(state=state, noCache=False).get_json()
+        assert len(cached["data"]) == 20
+        assert cached["report"]["cache"]["misses"] == 0
+    assert server.requests_served == served
@@ -0,0 +1,67 @@
+import threading
+import time
+from utils.single_flight import SingleFlight
+
+
+def test_concurrent_requests_share_one_scrape(gem_server, scrape):
+    server = gem_server(pages=3, latency=0.2)
+    alone = scrape().get_json()["data"]
+    served = server.requests_served
+
+    responses = [None] * 3
+
+    def request(i):
+        responses[i] = scrape().get_json()
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.1)
+    for thread in threads:
+        thread.join()
+
+    assert server.requests_served - served == served
+    assert [len(response["data"]) for response in responses] == [len(alone)] * 3
+    assert sum(bool(response["report"].get("coalesced")) for response in responses) == 2
+
+
+def test_late_caller_replays_earlier_events():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def produce(should_stop):
+        yield 1
+        release.wait(2)
+        yield 2
+
+    flight, leader = flights.join("key", produce)
+    follower, follower_leads = flights.join("key", produce)
+    release.set()
+
+    assert leader and not follower_leads
+    assert follower is flight
+    assert list(flight.follow()) == list(follower.follow()) == [1, 2]
+
+
+def test_abandoned_flight_stops():
+    flights = SingleFlight()
+    stopped = threading.Event()
+
+    def produce(should_stop):
+        n = 0
+        while not should_stop():
+            yield n
+            n += 1
+            time.sleep(0.01)
+        stopped.set()
+
+    flight, _ = flights.join("key", produce)
+    seen = []
+    for event in flight.follow(should_stop=lambda: len(seen) == 3):
+        seen.append(event)
+
+    assert seen == [0, 1, 2]
+    assert stopped.wait(2)
+    # The abandoned flight is forgotten, so the next caller starts afresh.
+    flight_again, leader = flights.join("key", produce)
+    assert leader and flight_again is not flight
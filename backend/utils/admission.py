@@ -0,0 +1,150 @@
+import math
+import os
+import threading
+import time
+from functools import partial
+from utils.driver_pool import warm_browsers
+from utils.memory import SESSION_MEMORY, memory_limit
+from utils.metrics import ADMISSION_REJECTIONS, REGISTRY, Gauge
+
+
+class AdmissionRejected(Exception):
+    """Raised when a scrape cannot get browser sessions; ``retry_after`` is a hint in seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def session_capacity(max_sessions, reserve, limit=None, session_memory=SESSION_MEMORY, warm_browsers=None):
+    """How many browser sessions fit in memory: ``(limit - reserve) / measured session RSS``, at most ``max_sessions``.
+
+    The idle browsers the driver pools keep warm (``warm_browsers()``) take
+    their share of the memory too.
+    """
+    if limit is None:
+        return max_sessions
+    warm = warm_browsers() if warm_browsers else 0
+    return max(1, min(max_sessions, (limit - reserve) // session_memory.estimate() - warm))
+
+
+class AdmissionController:
+    """Caps the browser sessions scrapes hold at once.
+
+    A scrape asks for as many sessions as it will open. Requests over the cap
+    wait in FIFO order for up to ``max_wait`` seconds, with at most
+    ``max_queued`` waiting; otherwise they are rejected with an estimate of
+    when to retry. ``capacity()`` is re-read while waiting, so the cap follows
+    the measured memory of the running browsers.
+    """
+
+    def __init__(self, capacity, max_queued=4, max_wait=30, logger=None):
+        self.capacity = capacity
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        self.logger = logger
+        self.in_use = 0
+        self._waiting = []
+        # Typical time a scrape holds its sessions, for Retry-After.
+        self._average_hold = 30.0
+        self._cond = threading.Condition()
+
+    def stats(self):
+        with self._cond:
+            return {"capacity": self.capacity(), "in_use": self.in_use, "queued": len(self._waiting)}
+
+    def acquire(self, sessions=1, background=False, should_stop=None, timeout=None):
+        """Blocks until ``sessions`` browser sessions are free and returns the callable that frees them.
+
+        Foreground callers wait up to ``timeout`` seconds (``max_wait`` by
+        default). Background callers (scrape jobs, already queued by the job
+        manager) wait without a deadline or queue limit until ``should_stop()``.
+        """
+        sessions = max(1, min(sessions, self.capacity()))
+        ticket = object()
+        wait = self.max_wait if timeout is None else timeout
+        deadline = None if background else time.monotonic() + wait
+        with self._cond:
+            must_wait = self._waiting or self.in_use + sessions > self.capacity()
+            if must_wait and not background and len(self._waiting) >= self.max_queued:
+                raise self._reject(f"The queue for browser sessions is full ({len(self._waiting)} waiting)", len(self._waiting))
+            self._waiting.append(ticket)
+            try:
+                while self._waiting[0] is not ticket or self.in_use + sessions > self.capacity():
+                    if should_stop and should_stop():
+                        raise AdmissionRejected("Stopped while waiting for a browser session", 0)
+                    remaining = 1.0 if deadline is None else deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._reject(f"No browser session was free within {wait:.3g}s",
+                                           self._waiting.index(ticket))
+                    self._cond.wait(min(remaining, 1.0))
+            finally:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+            self.in_use += sessions
+        return partial(self._release, sessions, time.monotonic())
+
+    def rejection(self, reason):
+        """The ``AdmissionRejected`` for a request that gave up waiting on another scrape's admission."""
+        with self._cond:
+            return self._reject(reason, len(self._waiting))
+
+    def _release(self, sessions, acquired_at):
+        with self._cond:
+            self.in_use -= sessions
+            self._average_hold += 0.2 * (time.monotonic() - acquired_at - self._average_hold)
+            self._cond.notify_all()
+
+    def _reject(self, reason, ahead):
+        """The Retry-After hint assumes the ``ahead`` scrapes queued before this one each hold the sessions for the average time."""
+        retry_after = max(1, math.ceil(self._average_hold * (ahead + 1) / max(1, self.capacity())))
+        ADMISSION_REJECTIONS.inc()
+        if self.logger:
+            self.logger.warning(f"Rejected a scrape: {reason} ({self.in_use} session(s) in use).")
+        return AdmissionRejected(f"{reason}. Please try again later.", retry_after)
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller(logger=None):
+    """Returns the process-wide admission controller.
+
+    The cap is ``ADMISSION_MAX_SESSIONS`` (by default ``DRIVER_POOL_SIZE``),
+    lowered to what fits in the container's memory once
+    ``ADMISSION_MEMORY_RESERVE_MB`` is set aside for the app itself, at the
+    largest Chrome process-tree RSS the driver pool has measured recently
+    (``SESSION_MEMORY_MB`` until a browser has run), less the warm idle
+    browsers of every profile's driver pool.
+    """
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            capacity = partial(
+                session_capacity,
+                int(os.environ.get("ADMISSION_MAX_SESSIONS", os.environ.get("DRIVER_POOL_SIZE", 2))),
+                int(os.environ.get("ADMISSION_MEMORY_RESERVE_MB", 512)) * 2 ** 20,
+                memory_limit(),
+                warm_browsers=warm_browsers,
+            )
+            _controller = AdmissionController(
+                capacity,
+                max_queued=int(os.environ.get("ADMISSION_MAX_QUEUED", 4)),
+                max_wait=float(os.environ.get("ADMISSION_MAX_WAIT", 30)),
+                logger=logger,
+            )
+            if logger:
+                logger.info(f"Admission control: up to {capacity()} concurrent browser session(s).")
+        return _controller
+
+
+def _admission_stats():
+    if _controller is None:
+        return {}
+    return {(status,): value for status, value in _controller.stats().items()}
+
+
+REGISTRY.register(Gauge(
+    "gem_admission_sessions", "Browser session admission: capacity, sessions in use and scrapes queued.", ("status",),
+    callback=_admission_stats))
@@ -0,0 +1,223 @@
+import base64
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bids (
+    bid_number TEXT PRIMARY KEY,
+    bid_url TEXT,
+    items TEXT,
+    quantity_text TEXT,
+    quantity INTEGER,
+    department TEXT COLLATE NOCASE,
+    state TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    start_at TEXT,
+    end_at TEXT,
+    first_seen_at TEXT NOT NULL,
+    last_seen_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bids_start_at ON bids (start_at, bid_number);
+CREATE INDEX IF NOT EXISTS idx_bids_end_at ON bids (end_at);
+CREATE INDEX IF NOT EXISTS idx_bids_state_start_at ON bids (state, start_at, bid_number);
+CREATE INDEX IF NOT EXISTS idx_bids_department ON bids (department);
+"""
+
+# Full-text index over items/department, kept in sync with triggers.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS bids_fts USING fts5 (
+    items, department, content='bids', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS bids_fts_insert AFTER INSERT ON bids BEGIN
+    INSERT INTO bids_fts (rowid, items, department) VALUES (new.rowid, new.items, new.department);
+END;
+CREATE TRIGGER IF NOT EXISTS bids_fts_delete AFTER DELETE ON bids BEGIN
+    INSERT INTO bids_fts (bids_fts, rowid, items, department) VALUES ('delete', old.rowid, old.items, old.department);
+END;
+CREATE TRIGGER IF NOT EXISTS bids_fts_update AFTER UPDATE OF items, department ON bids BEGIN
+    INSERT INTO bids_fts (bids_fts, rowid, items, department) VALUES ('delete', old.rowid, old.items, old.department);
+    INSERT INTO bids_fts (rowid, items, department) VALUES (new.rowid, new.items, new.department);
+END;
+"""
+
+UPSERT = """
+INSERT INTO bids (bid_number, bid_url, items, quantity_text, quantity, department, state,
+                  start_date, end_date, start_at, end_at, first_seen_at, last_seen_at)
+VALUES (:bid_number, :bid_url, :items, :quantity_text, :quantity, :department, :state,
+        :start_date, :end_date, :start_at, :end_at, :seen_at, :seen_at)
+ON CONFLICT (bid_number) DO UPDATE SET
+    bid_url = excluded.bid_url,
+    items = excluded.items,
+    quantity_text = excluded.quantity_text,
+    quantity = excluded.quantity,
+    department = excluded.department,
+    state = COALESCE(excluded.state, bids.state),
+    start_date = excluded.start_date,
+    end_date = excluded.end_date,
+    start_at = excluded.start_at,
+    end_at = excluded.end_at,
+    last_seen_at = excluded.last_seen_at
+"""
+
+COLUMNS = ("bid_number", "bid_url", "items", "quantity", "department", "state", "start_date", "end_date")
+# Parsed columns used for exports.
+EXPORT_COLUMNS = ("bid_number", "bid_url", "items", "quantity", "department", "state",
+                  "start_at", "end_at", "first_seen_at", "last_seen_at")
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(start_at, bid_number):
+    return base64.urlsafe_b64encode(json.dumps([start_at, bid_number]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        start_at, bid_number = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return start_at, bid_number
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class BidStore:
+    """Persistent SQLite store of every scraped bid, upserted by bid number.
+
+    Dates and quantity are stored both as shown by the portal and parsed
+    (ISO-8601 timestamps, integer quantity) so they can be indexed and filtered.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._local = threading.local()
+        self.full_text = True
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; fall back to LIKE matching.
+            self.full_text = False
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, bids, state=None):
+        """Inserts or refreshes ``Bid`` records; returns how many rows were written.
+
+        ``state`` is used for bids that were not tagged with one.
+        """
+        seen_at = datetime.now().isoformat(timespec="seconds")
+        rows = []
+        for bid in bids:
+            if not bid.bid_number:
+                continue
+            row = bid.to_dict()
+            row.update(
+                quantity_text=row["quantity"],
+                quantity=bid.quantity,
+                state=(bid.state or state or "").strip().upper() or None,
+                start_at=bid.start_at.isoformat(),
+                end_at=bid.end_at.isoformat() if bid.end_at else None,
+                seen_at=seen_at,
+            )
+            rows.append(row)
+        if not rows:
+            return 0
+        conn = self._connection()
+        with conn:
+            conn.executemany(UPSERT, rows)
+        return len(rows)
+
+    def query(self, state=None, department=None, start_from=None, start_to=None,
+              end_from=None, end_to=None, text=None, cursor=None, limit=50):
+        """Returns ``(bids, next_cursor)``, latest start date first.
+
+        Pagination is keyset-based on ``(start_at, bid_number)``; pass the
+        returned cursor to get the next page. ``department`` is a
+        case-insensitive prefix match and ``text`` searches items/department.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        clauses, args = self._filters(state, department, start_from, start_to, end_from, end_to, text)
+        if cursor:
+            start_at, bid_number = decode_cursor(cursor)
+            clauses.append("(b.start_at, b.bid_number) < (?, ?)")
+            args.extend([start_at, bid_number])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (f"SELECT {', '.join('b.' + c for c in COLUMNS)}, b.start_at FROM bids b {where} "
+               f"ORDER BY b.start_at DESC, b.bid_number DESC LIMIT ?")
+        rows = self._connection().execute(sql, args + [limit + 1]).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["start_at"], rows[-1]["bid_number"])
+        return [{column: row[column] for column in COLUMNS} for row in rows], next_cursor
+
+    def export(self, state=None, department=None, start_from=None, start_to=None,
+               end_from=None, end_to=None, text=None):
+        """Returns every matching bid as parsed columns, ``{column: tuple_of_values}``.
+
+        Takes the same filters as ``query``; rows are latest start date first.
+        """
+        clauses, args = self._filters(state, department, start_from, start_to, end_from, end_to, text)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (f"SELECT {', '.join('b.' + c for c in EXPORT_COLUMNS)} FROM bids b {where} "
+               f"ORDER BY b.start_at DESC, b.bid_number DESC")
+        rows = self._connection().execute(sql, args).fetchall()
+        columns = list(zip(*rows)) if rows else [()] * len(EXPORT_COLUMNS)
+        return dict(zip(EXPORT_COLUMNS, columns))
+
+    def _filters(self, state, department, start_from, start_to, end_from, end_to, text):
+        clauses, args = [], []
+        if state:
+            clauses.append("b.state = ?")
+            args.append(state.strip().upper())
+        if department:
+            clauses.append("b.department LIKE ? ESCAPE '\\'")
+            args.append(_like_literal(department) + "%")
+        for column, op, value in (("start_at", ">=", start_from), ("start_at", "<=", start_to),
+                                  ("end_at", ">=", end_from), ("end_at", "<=", end_to)):
+            if value:
+                clauses.append(f"b.{column} {op} ?")
+                args.append(value.isoformat())
+        if text:
+            if self.full_text:
+                clauses.append("b.rowid IN (SELECT rowid FROM bids_fts WHERE bids_fts MATCH ?)")
+                args.append(" ".join(f'"{term}"' for term in text.replace('"', " ").split()))
+            else:
+                clauses.append("(b.items LIKE ? ESCAPE '\\' OR b.department LIKE ? ESCAPE '\\')")
+                args.extend([f"%{_like_literal(text)}%"] * 2)
+        return clauses, args
+
+
+def _like_literal(value):
+    """Escapes LIKE wildcards so ``value`` matches literally (with ``ESCAPE '\\'``)."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_bid_store():
+    """Returns the process-wide bid store (``BID_STORE_PATH``, default ``data/bids.sqlite3``)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BidStore(os.environ.get("BID_STORE_PATH", os.path.join("data", "bids.sqlite3")))
+        return _store
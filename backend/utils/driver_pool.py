@@ -0,0 +1,342 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from utils.driver_setup import default_profile, get_webdriver
+from utils.memory import SESSION_MEMORY, process_tree_rss
+from utils.metrics import DRIVER_STARTUP_SECONDS, DRIVER_STARTUPS, REGISTRY, Gauge
+
+RESET_URL = "https://bidplus.gem.gov.in/advance-search"
+
+
+class DriverPoolExhausted(Exception):
+    """Raised when no WebDriver becomes available within the acquire timeout."""
+
+
+class _PooledDriver:
+    """Bookkeeping wrapper around a pooled WebDriver instance."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+
+class DriverPool:
+    """A bounded pool of warm, reusable Selenium WebDriver instances.
+
+    Returned drivers are reset (cookies, storage, navigation back to the
+    advance-search page) on a background thread, so the request that used
+    them does not wait for it. Idle drivers are health-checked when they are
+    checked out, and drivers are recycled after ``max_uses`` checkouts or as
+    soon as they stop responding.
+    """
+
+    def __init__(self, factory=get_webdriver, size=2, min_idle=1, max_uses=20,
+                 acquire_timeout=120, reset_url=RESET_URL, logger=None, name="standard"):
+        self.factory = factory
+        self.name = name
+        self.size = max(1, size)
+        self.min_idle = max(0, min(min_idle, self.size))
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self.reset_url = reset_url
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._idle = []
+        self._in_use = {}
+        self._starting = 0
+        self._resetting = {}
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def total(self):
+        """Number of drivers alive, being started or being reset."""
+        return len(self._idle) + len(self._in_use) + self._starting + len(self._resetting)
+
+    def stats(self):
+        """Returns a snapshot of the pool occupancy."""
+        with self._cond:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "starting": self._starting,
+                "resetting": len(self._resetting),
+            }
+
+    def warm_reserve(self):
+        """Idle browsers the pool keeps started on top of the checked-out ones."""
+        with self._cond:
+            return 0 if self._closed else min(self.min_idle, self.size - len(self._in_use))
+
+    def warm(self, wait=False):
+        """Starts drivers in the background until ``min_idle`` are idle."""
+        thread = threading.Thread(target=self._replenish, name="driver-pool-warm", daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+
+    def acquire(self, timeout=None):
+        """Checks a driver out of the pool, starting one if there is capacity.
+
+        Blocks for up to ``timeout`` seconds when the pool is exhausted.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise DriverPoolExhausted("Driver pool is closed")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self.total < self.size:
+                        self._starting += 1
+                        pooled = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DriverPoolExhausted(
+                            f"No WebDriver available after {timeout}s ({len(self._in_use)} in use)"
+                        )
+                    self._cond.wait(remaining)
+                if pooled is not None:
+                    self._in_use[id(pooled.driver)] = pooled
+
+            if pooled is None:
+                pooled = self._start_driver()
+                break
+            # A browser can die while idle; check before handing it out.
+            if self.is_healthy(pooled.driver):
+                break
+            self.logger.warning("Discarding an idle WebDriver that stopped responding.")
+            self._quit(pooled.driver)
+            with self._cond:
+                self._in_use.pop(id(pooled.driver), None)
+                self._cond.notify()
+
+        pooled.uses += 1
+        self.warm()
+        return pooled.driver
+
+    def release(self, driver, discard=False):
+        """Returns a driver to the pool; it is reset or recycled on a background thread."""
+        with self._cond:
+            pooled = self._in_use.pop(id(driver), None)
+            if pooled is not None:
+                self._resetting[id(driver)] = pooled
+            elif self._closed:
+                # close() has quit it already.
+                return
+        if pooled is None:
+            self.logger.warning("Released a WebDriver that does not belong to the pool; quitting it.")
+            self._quit(driver)
+            return
+
+        recycle = discard or self._closed or pooled.uses >= self.max_uses
+        threading.Thread(target=self._park, args=(pooled, recycle), name="driver-pool-reset", daemon=True).start()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager that checks out a driver and always returns it.
+
+        A driver whose block did not finish normally (an exception, or a
+        streaming generator closed early) is recycled instead of reused.
+        """
+        driver = self.acquire(timeout)
+        discard = True
+        try:
+            yield driver
+            discard = False
+        finally:
+            self.release(driver, discard=discard)
+
+    def is_healthy(self, driver):
+        """Cheap liveness probe: the browser must answer a round trip."""
+        try:
+            driver.execute_script("return document.readyState;")
+            return True
+        except Exception as e:
+            self.logger.warning(f"WebDriver failed health check: {e}")
+            return False
+
+    def close(self):
+        """Quits every driver of the pool, idle, checked out or being reset.
+
+        Meant for shutdown: a scrape still using a driver fails, and releasing
+        the driver afterwards does nothing.
+        """
+        with self._cond:
+            self._closed = True
+            pooled = self._idle + list(self._in_use.values()) + list(self._resetting.values())
+            self._idle, self._in_use, self._resetting = [], {}, {}
+            self._cond.notify_all()
+        for entry in pooled:
+            self._quit(entry.driver)
+
+    def _start_driver(self, idle=False):
+        """Starts a driver for a slot already reserved in ``_starting``."""
+        pooled = None
+        try:
+            started = time.monotonic()
+            pooled = _PooledDriver(self.factory())
+            elapsed = time.monotonic() - started
+            DRIVER_STARTUPS.inc(profile=self.name)
+            DRIVER_STARTUP_SECONDS.observe(elapsed, profile=self.name)
+            self.logger.info(f"Started pooled WebDriver in {elapsed:.2f}s")
+            if self.reset_url:
+                pooled.driver.get(self.reset_url)
+        except Exception:
+            if pooled is not None:
+                self._quit(pooled.driver)
+            with self._cond:
+                self._starting -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._starting -= 1
+            closed = self._closed
+            if closed:
+                self._cond.notify()
+            elif idle:
+                self._idle.append(pooled)
+                self._cond.notify()
+            else:
+                self._in_use[id(pooled.driver)] = pooled
+        if closed:
+            self._quit(pooled.driver)
+            raise DriverPoolExhausted("Driver pool is closed")
+        return pooled
+
+    def _park(self, pooled, recycle):
+        """Resets a returned driver and makes it idle again, or quits it when it is to be recycled."""
+        driver = pooled.driver
+        # Measured after a scrape, when the browser is at its largest.
+        self._measure(driver)
+        if not recycle and self._reset(driver):
+            with self._cond:
+                if not self._closed:
+                    del self._resetting[id(driver)]
+                    self._idle.append(pooled)
+                    self._cond.notify()
+                    return
+
+        with self._cond:
+            # close() quits the drivers it takes.
+            owned = id(driver) in self._resetting
+        if owned:
+            self.logger.info(f"Recycling WebDriver after {pooled.uses} use(s).")
+            self._quit(driver)
+        with self._cond:
+            self._resetting.pop(id(driver), None)
+            self._cond.notify()
+        self.warm()
+
+    def _replenish(self):
+        while True:
+            with self._cond:
+                if self._closed or len(self._idle) + self._starting >= self.min_idle or self.total >= self.size:
+                    return
+                self._starting += 1
+            try:
+                self._start_driver(idle=True)
+            except Exception as e:
+                self.logger.error(f"Could not warm up a WebDriver: {e}")
+                return
+
+    def _reset(self, driver):
+        """Clears browser state and parks the driver on the advance-search page."""
+        try:
+            driver.delete_all_cookies()
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            if self.reset_url:
+                driver.get(self.reset_url)
+            return True
+        except Exception as e:
+            self.logger.warning(f"Could not reset WebDriver, it will be recycled: {e}")
+            return False
+
+    def _measure(self, driver):
+        """Records the resident memory of the driver's Chrome process tree for admission control."""
+        try:
+            SESSION_MEMORY.observe(process_tree_rss(driver.service.process.pid))
+        except Exception as e:
+            self.logger.debug(f"Could not measure WebDriver memory: {e}")
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            self.logger.warning(f"Error while quitting WebDriver: {e}")
+
+
+_pools = {}
+_pool_lock = threading.Lock()
+
+
+def _pool_occupancy():
+    with _pool_lock:
+        pools = dict(_pools)
+    occupancy = {}
+    for profile, pool in pools.items():
+        stats = pool.stats()
+        for status in ("idle", "in_use", "starting", "resetting"):
+            occupancy[(profile, status)] = stats[status]
+    return occupancy
+
+
+REGISTRY.register(Gauge(
+    "gem_driver_pool_drivers", "Pooled WebDrivers by profile and status.", ("profile", "status"),
+    callback=_pool_occupancy))
+
+
+def warm_browsers():
+    """Idle browsers kept warm across every profile's pool, for admission control."""
+    with _pool_lock:
+        pools = list(_pools.values())
+    return sum(pool.warm_reserve() for pool in pools)
+
+
+def get_driver_pool(logger=None, profile=None):
+    """Returns the process-wide driver pool for a driver profile, creating it on first use.
+
+    Each profile (see ``utils.driver_setup.PROFILES``) has its own pool of up
+    to ``DRIVER_POOL_SIZE`` browsers. Pools are created lazily so that
+    gunicorn's ``--preload`` does not start browsers in the master process
+    before the worker is forked.
+    """
+    profile = profile or default_profile()
+    with _pool_lock:
+        pool = _pools.get(profile)
+        if pool is None:
+            pool = DriverPool(
+                factory=partial(get_webdriver, profile),
+                size=int(os.environ.get("DRIVER_POOL_SIZE", 2)),
+                min_idle=int(os.environ.get("DRIVER_POOL_MIN_IDLE", 1)),
+                max_uses=int(os.environ.get("DRIVER_POOL_MAX_USES", 20)),
+                acquire_timeout=float(os.environ.get("DRIVER_POOL_ACQUIRE_TIMEOUT", 120)),
+                logger=logger,
+                name=profile,
+            )
+            pool.warm()
+            _pools[profile] = pool
+        return pool
+
+
+@atexit.register
+def close_driver_pools():
+    """Quits the browsers of every profile's pool.
+
+    Runs when the process exits, including a gunicorn worker recycled by
+    ``--max-requests``, so no Chrome outlives the worker that started it.
+    """
+    with _pool_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
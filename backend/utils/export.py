@@ -0,0 +1,60 @@
+import io
+
+# format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", "arrow"),
+}
+DATETIME_COLUMNS = ("start_at", "end_at", "first_seen_at", "last_seen_at")
+
+
+class ExportUnavailable(Exception):
+    """The requested export format needs an optional dependency that is not installed."""
+
+
+def build_frame(columns):
+    """Builds a typed DataFrame from ``{column: values}`` in one vectorized pass.
+
+    Timestamps become ``datetime64`` and quantity a nullable integer column.
+    pandas is imported here so that scraping never has to load it.
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame({name: list(values) for name, values in columns.items()})
+    for name in frame.columns:
+        if name in DATETIME_COLUMNS:
+            frame[name] = pd.to_datetime(frame[name], errors="coerce")
+        elif name == "quantity":
+            frame[name] = pd.to_numeric(frame[name], errors="coerce").astype("Int64")
+        else:
+            frame[name] = frame[name].astype("string")
+    return frame
+
+
+def render_export(columns, fmt):
+    """Returns the export as ``(body_bytes, mimetype, extension)``.
+
+    CSV only needs pandas; Parquet and Arrow IPC need pyarrow and raise
+    ``ExportUnavailable`` without it.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid format. Use one of: {', '.join(EXPORT_FORMATS)}")
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    frame = build_frame(columns)
+    if fmt == "csv":
+        return frame.to_csv(index=False).encode("utf-8"), mimetype, extension
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportUnavailable(f"The {fmt} export needs pyarrow, which is not installed")
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = io.BytesIO()
+    if fmt == "parquet":
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue(), mimetype, extension
@@ -0,0 +1,69 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+def create_session(pool_maxsize=10):
+    """Returns a ``requests.Session`` with keep-alive connection pooling and a browser user agent."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+class SessionPool:
+    """A small pool of HTTP sessions.
+
+    Sessions keep their cookies (and the CSRF token the HTTP scraper stores on
+    them) between checkouts, so a warm session can skip the token handshake.
+    """
+
+    def __init__(self, size=8):
+        self.size = size
+        self._sessions = queue.LifoQueue(maxsize=size)
+
+    @contextmanager
+    def session(self, discard_on=()):
+        """Checks a session out of the pool, creating one when none is idle.
+
+        The session is closed instead of pooled again after a request error or
+        one of ``discard_on``.
+        """
+        try:
+            session = self._sessions.get_nowait()
+        except queue.Empty:
+            session = create_session()
+        discard = False
+        try:
+            yield session
+        except (requests.RequestException,) + tuple(discard_on):
+            discard = True
+            raise
+        finally:
+            if discard:
+                session.close()
+            else:
+                try:
+                    self._sessions.put_nowait(session)
+                except queue.Full:
+                    session.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool():
+    """Returns the process-wide HTTP session pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SessionPool(size=int(os.environ.get("HTTP_SESSION_POOL_SIZE", 8)))
+        return _pool
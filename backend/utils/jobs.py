@@ -0,0 +1,143 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting for a worker."""
+
+
+class Job:
+    """State of one background scrape, updated by the worker as pages complete."""
+
+    def __init__(self, params):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.pages_done = 0
+        self.bids = []
+        self.report = {}
+        self.error = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_page(self, page_num, page_bids):
+        """Progress callback handed to ``run_scrape``; shards may report pages out of order.
+
+        Page 0 carries the bids served from the result cache.
+        """
+        with self._lock:
+            if page_num:
+                self.pages_done += 1
+            self.bids.extend(page_bids)
+
+    def should_stop(self):
+        return self.cancel_event.is_set()
+
+    def to_dict(self, since=0):
+        """Serializable status; ``data`` holds the bids collected from index ``since`` on."""
+        with self._lock:
+            return {
+                "jobId": self.id,
+                "status": self.status,
+                "createdAt": self.created_at,
+                "startedAt": self.started_at,
+                "finishedAt": self.finished_at,
+                "pagesDone": self.pages_done,
+                "bidsSoFar": len(self.bids),
+                "report": self.report,
+                "error": self.error,
+                "data": [bid.to_dict() for bid in self.bids[since:]],
+            }
+
+
+class JobManager:
+    """Runs scrape jobs on a bounded worker pool and keeps finished jobs until they expire."""
+
+    def __init__(self, max_workers=2, max_queued=20, ttl=3600, logger=None):
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.logger = logger or logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, params, run):
+        """Queues ``run(job)`` and returns the new job.
+
+        ``run`` should report progress through ``job.add_page`` and honour
+        ``job.should_stop``; its return value is stored as the job report.
+        """
+        self.expire()
+        with self._lock:
+            queued = sum(1 for job in self._jobs.values() if job.status == QUEUED)
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"{queued} jobs are already waiting")
+            job = Job(params)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, run)
+        self.logger.info(f"Queued scrape job {job.id}")
+        return job
+
+    def get(self, job_id):
+        self.expire()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Flags a job for cancellation; a running scrape stops after its current page."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel_event.set()
+        with job._lock:
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished_at = time.time()
+        return job
+
+    def expire(self):
+        """Drops finished jobs older than the TTL."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.status in FINISHED_STATES and job.finished_at and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+        if expired:
+            self.logger.info(f"Expired {len(expired)} finished scrape job(s).")
+
+    def _run(self, job, run):
+        with job._lock:
+            if job.status == CANCELLED:
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+        try:
+            report = run(job)
+            status, error = SUCCEEDED, None
+        except Exception as e:
+            report = None
+            if job.cancel_event.is_set():
+                status, error = CANCELLED, None
+            else:
+                self.logger.error(f"Scrape job {job.id} failed: {e}", exc_info=True)
+                status, error = FAILED, str(e)
+        with job._lock:
+            job.status = status
+            job.error = error
+            job.report = report or {}
+            job.finished_at = time.time()
+        self.logger.info(f"Scrape job {job.id} finished with status {status}.")
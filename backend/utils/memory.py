@@ -0,0 +1,90 @@
+import os
+import threading
+from collections import deque
+
+CGROUP_LIMIT_FILES = (
+    "/sys/fs/cgroup/memory.max",                    # cgroup v2
+    "/sys/fs/cgroup/memory/memory.limit_in_bytes",  # cgroup v1
+)
+
+
+def process_tree_rss(root_pid):
+    """Resident memory in bytes of a process and all its descendants (Linux ``/proc``)."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; the parent pid follows its closing parenthesis.
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+def memory_limit():
+    """Memory available to this container in bytes: its cgroup limit, else the machine's total; None if unknown."""
+    total = None
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    total = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    for path in CGROUP_LIMIT_FILES:
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # "max" (v2) or a huge number (v1) means the cgroup is unlimited.
+        if value.isdigit() and (total is None or int(value) < total):
+            return int(value)
+    return total
+
+
+class SessionMemory:
+    """Recent resident-memory measurements of browser sessions (a Chrome process tree each).
+
+    ``estimate()`` is the largest of the last ``window`` measurements, or
+    ``default`` until a browser has been measured.
+    """
+
+    def __init__(self, default, window=20):
+        self.default = default
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, rss):
+        if rss:
+            with self._lock:
+                self._samples.append(rss)
+
+    def estimate(self):
+        with self._lock:
+            return max(self._samples) if self._samples else self.default
+
+    def measured(self):
+        with self._lock:
+            return bool(self._samples)
+
+
+SESSION_MEMORY = SessionMemory(default=int(os.environ.get("SESSION_MEMORY_MB", 400)) * 2 ** 20)
@@ -0,0 +1,161 @@
+"""In-process Prometheus metrics, rendered in the text exposition format by ``/metrics``.
+
+The service runs a single gunicorn worker, so one registry per process covers
+every request.
+"""
+import threading
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """A gauge set directly, or read from ``callback()`` (``{label_values_tuple: value}``) at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self):
+        if self.callback is None:
+            return super()._samples()
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self.callback().items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in items:
+            for bound, count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "gem_http_request_duration_seconds", "Latency of API requests.", ("method", "endpoint", "status")))
+SCRAPE_SECONDS = REGISTRY.register(Histogram(
+    "gem_scrape_duration_seconds", "Wall time of whole scrapes.", ("engine",)))
+SCRAPE_PHASE_SECONDS = REGISTRY.register(Histogram(
+    "gem_scrape_phase_seconds", "Time spent per scrape phase (session acquire, load_page, filters, waits, extraction).",
+    ("engine", "phase"), buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)))
+SCRAPES_IN_FLIGHT = REGISTRY.register(Gauge(
+    "gem_scrapes_in_flight", "Scrapes currently running."))
+PAGES_SCRAPED = REGISTRY.register(Counter(
+    "gem_pages_scraped_total", "Result pages visited.", ("engine",)))
+BIDS_SCRAPED = REGISTRY.register(Counter(
+    "gem_bids_scraped_total", "Bids collected from result pages.", ("engine",)))
+PORTAL_ERRORS = REGISTRY.register(Counter(
+    "gem_portal_errors_total", "Portal 'Something went wrong' errors hit by scraper sessions, retried or not.", ("engine",)))
+BID_DOCUMENTS = REGISTRY.register(Counter(
+    "gem_bid_documents_total", "Bid documents read for enrichment, by source (cached, fetched, failed).", ("source",)))
+DRIVER_STARTUPS = REGISTRY.register(Counter(
+    "gem_driver_startups_total", "Chrome WebDriver instances started.", ("profile",)))
+DRIVER_STARTUP_SECONDS = REGISTRY.register(Histogram(
+    "gem_driver_startup_seconds", "Time to start a Chrome WebDriver instance.", ("profile",),
+    buckets=(0.5, 1, 2, 3, 5, 10, 20, 40, 60)))
+ADMISSION_REJECTIONS = REGISTRY.register(Counter(
+    "gem_admission_rejections_total", "Scrapes turned away with 429 because no browser session was free in time."))
+COALESCED_SCRAPES = REGISTRY.register(Counter(
+    "gem_coalesced_scrapes_total", "Scrape requests served by joining an identical scrape already in flight."))
@@ -0,0 +1,60 @@
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, bursts of up to ``capacity``."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Blocks until ``tokens`` are available and takes them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostLimiter:
+    """Politeness limits for one host: concurrent sessions and page requests per second."""
+
+    def __init__(self, max_concurrent=2, rate=2.0):
+        self.max_concurrent = max_concurrent
+        self._sessions = threading.BoundedSemaphore(max_concurrent)
+        self._bucket = TokenBucket(rate, capacity=max_concurrent)
+
+    @contextmanager
+    def session(self):
+        """Holds one of the host's concurrent session slots."""
+        with self._sessions:
+            yield
+
+    def pace(self):
+        """Blocks until another page request to the host is allowed."""
+        self._bucket.acquire()
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_host_limiter(url, max_concurrent=2, rate=2.0):
+    """Returns the shared limiter for the host of ``url``, creating it on first use."""
+    host = urlparse(url).netloc or url
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = HostLimiter(max_concurrent=max_concurrent, rate=rate)
+        return _limiters[host]
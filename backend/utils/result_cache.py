@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+
+def _days(params):
+    first_day = params["start_date"].date()
+    last_day = params["end_date"].date()
+    return [first_day + timedelta(days=n) for n in range((last_day - first_day).days + 1)]
+
+
+class DayCache:
+    """LRU cache of scraped bids per (state, calendar day of the bid start date).
+
+    Days that are fully in the past are treated as near-immutable and kept for
+    ``past_ttl`` seconds; today (and later) can still gain bids, so those
+    entries expire after ``today_ttl`` seconds.
+    """
+
+    def __init__(self, max_entries=1024, past_ttl=24 * 3600, today_ttl=300, logger=None):
+        self.max_entries = max_entries
+        self.past_ttl = past_ttl
+        self.today_ttl = today_ttl
+        self.logger = logger
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.scrapes = 0
+
+    @staticmethod
+    def _key(state, day):
+        return ((state or "").strip().upper(), day)
+
+    def get(self, state, day):
+        """Returns the cached bids for a day, or None when missing or expired."""
+        key = self._key(state, day)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, bids = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return bids
+
+    def put(self, state, day, bids):
+        ttl = self.past_ttl if day < datetime.now().date() else self.today_ttl
+        key = self._key(state, day)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, list(bids))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "scrapes": self.scrapes,
+            }
+
+    def plan(self, params, bypass=False):
+        """Splits a request window into cached days and the span that still has to be scraped.
+
+        The uncovered days are scraped as one contiguous window; cached days
+        inside that window are refreshed by the scrape rather than served twice.
+        """
+        state = params.get("state")
+        days = _days(params)
+
+        cached = {}
+        if not bypass:
+            for day in days:
+                bids = self.get(state, day)
+                if bids is not None:
+                    cached[day] = bids
+        missing = [day for day in days if day not in cached]
+        with self._lock:
+            self.hits += len(days) - len(missing)
+            self.misses += len(missing)
+
+        plan = CachePlan(state, days, cached, bypass)
+        if missing:
+            plan.scraped_days = [missing[0] + timedelta(days=n) for n in range((missing[-1] - missing[0]).days + 1)]
+            for day in plan.scraped_days:
+                cached.pop(day, None)
+            plan.window = dict(
+                params,
+                start_date=datetime.combine(missing[0], datetime.min.time()),
+                end_date=datetime.combine(missing[-1], datetime.max.time()).replace(microsecond=0),
+            )
+            plan.misses = len(missing)
+            if self.logger:
+                self.logger.info(f"Result cache: {len(days) - len(missing)} day(s) cached, scraping {missing[0]} to {missing[-1]}.")
+        return plan
+
+    def fill(self, plan, bids):
+        """Stores freshly scraped bids for every day of the plan's scrape window."""
+        with self._lock:
+            self.scrapes += 1
+        fresh = {}
+        for bid in bids:
+            day = bid.start_at.date()
+            fresh.setdefault(day, []).append(bid)
+        for day in plan.scraped_days:
+            plan.by_day[day] = fresh.get(day, [])
+            self.put(plan.state, day, plan.by_day[day])
+
+
+class CachePlan:
+    """Which days of a request are served from the cache and which window is scraped."""
+
+    def __init__(self, state, days, cached, bypass):
+        self.state = state
+        self.days = days
+        self.by_day = cached
+        self.bypass = bypass
+        self.scraped_days = []
+        self.window = None
+        self.misses = 0
+
+    def cached_bids(self, newer=True):
+        """Bids of the cached days newer (or older) than the scrape window, latest day first.
+
+        Without a scrape window every cached day counts as newer.
+        """
+        def wanted(day):
+            if not self.scraped_days:
+                return newer
+            return day > self.scraped_days[-1] if newer else day < self.scraped_days[0]
+
+        return [bid for day in reversed(self.days) if day in self.by_day and wanted(day) for bid in self.by_day[day]]
+
+    def report(self):
+        return {
+            "days": len(self.days),
+            "hits": len(self.days) - self.misses,
+            "misses": self.misses,
+            "bypassed": self.bypass,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache(logger=None):
+    """Returns the process-wide result cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DayCache(
+                max_entries=int(os.environ.get("RESULT_CACHE_MAX_DAYS", 1024)),
+                past_ttl=int(os.environ.get("RESULT_CACHE_PAST_TTL", 24 * 3600)),
+                today_ttl=int(os.environ.get("RESULT_CACHE_TODAY_TTL", 300)),
+                logger=logger,
+            )
+        return _cache
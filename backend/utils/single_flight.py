@@ -0,0 +1,156 @@
+import threading
+import time
+
+
+class Flight:
+    """One execution shared by every caller that asked for the same key while it ran.
+
+    Events are kept as they are published, so a caller joining late replays
+    them from the start before waiting for the rest.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.done = False
+        self.error = None
+        self.rejection = None
+        self.subscribers = 1
+        self.started = threading.Event()
+        self._cond = threading.Condition()
+
+    def publish(self, event):
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    def reject(self, error):
+        """Marks a flight whose leader was not admitted; callers waiting on it join again."""
+        self.rejection = error
+        self.finish(error)
+        self.started.set()
+
+    def abandoned(self):
+        """True once no caller is following the flight any more."""
+        with self._cond:
+            return self.subscribers == 0
+
+    def follow(self, should_stop=None):
+        """Yields every event of the flight, then re-raises the error it ended with.
+
+        Returns early, without the remaining events, once ``should_stop()`` is true.
+        """
+        index = 0
+        try:
+            while True:
+                with self._cond:
+                    while index == len(self.events) and not self.done:
+                        if should_stop and should_stop():
+                            return
+                        self._cond.wait(1.0)
+                    events = self.events[index:]
+                    index = len(self.events)
+                    done, error = self.done, self.error
+                for event in events:
+                    if should_stop and should_stop():
+                        return
+                    yield event
+                if done:
+                    if error is not None:
+                        raise error
+                    return
+        finally:
+            with self._cond:
+                self.subscribers -= 1
+
+
+class SingleFlight:
+    """Runs at most one execution per key at a time; concurrent callers with the same key share it."""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def join(self, key, produce, admit=None, wait=None, should_stop=None):
+        """Returns ``(flight, leader)`` for ``key``, starting the execution when none is running.
+
+        The first caller is the leader: it calls ``admit()``, which may block or
+        raise, and which returns a callable to run when the execution ends (or
+        None). ``produce(should_stop)`` then runs on a background thread and its
+        events are published to the flight; ``should_stop()`` turns true when
+        every caller has stopped following.
+
+        A later caller shares the leader's flight once it is admitted. It waits
+        for that up to ``wait`` seconds (None: until its own ``should_stop()``)
+        and gets ``(None, False)`` when the flight did not start in time. A
+        rejection of the leader is not passed on: the waiting callers join
+        again, and one of them is admitted on its own terms.
+        """
+        deadline = None if wait is None else time.monotonic() + wait
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                if flight is not None and not flight.done:
+                    with flight._cond:
+                        flight.subscribers += 1
+                    leader = False
+                else:
+                    flight = self._flights[key] = Flight()
+                    leader = True
+
+            if leader:
+                break
+            if not self._wait_started(flight, deadline, should_stop):
+                with flight._cond:
+                    flight.subscribers -= 1
+                return None, False
+            if flight.rejection is None:
+                return flight, False
+            with flight._cond:
+                flight.subscribers -= 1
+
+        try:
+            release = admit() if admit else None
+        except Exception as e:
+            self._forget(key, flight)
+            flight.reject(e)
+            raise
+        flight.started.set()
+        threading.Thread(target=self._run, args=(key, flight, produce, release), name="single-flight",
+                         daemon=True).start()
+        return flight, True
+
+    @staticmethod
+    def _wait_started(flight, deadline, should_stop):
+        while True:
+            if should_stop and should_stop():
+                return False
+            remaining = 1.0 if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if flight.started.wait(min(remaining, 1.0)):
+                return True
+
+    def _run(self, key, flight, produce, release):
+        error = None
+        try:
+            for event in produce(flight.abandoned):
+                flight.publish(event)
+        except Exception as e:
+            error = e
+        finally:
+            if release:
+                release()
+            # Callers arriving from now on start a new execution instead of replaying this one.
+            self._forget(key, flight)
+            flight.finish(error)
+
+    def _forget(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
@@ -0,0 +1,60 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from utils.metrics import BIDS_SCRAPED, PAGES_SCRAPED, SCRAPE_PHASE_SECONDS
+
+
+class ScrapeTimings:
+    """Timing spans of one scrape, per phase and per results page.
+
+    Every span is also observed in the ``gem_scrape_phase_seconds`` histogram;
+    ``summary()`` is what ``/scrape`` returns when timings are requested.
+    Shard workers record into the same instance from several threads.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.started = time.monotonic()
+        self._phases = {}
+        self._pages = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def record(self, phase, seconds):
+        SCRAPE_PHASE_SECONDS.observe(seconds, engine=self.engine, phase=phase)
+        with self._lock:
+            count, total, longest = self._phases.get(phase, (0, 0.0, 0.0))
+            self._phases[phase] = (count + 1, total + seconds, max(longest, seconds))
+
+    def page(self, page_num, seconds, bids, state=None):
+        """Records one results page: the time to reach and read it, and the bids it gave."""
+        self.record("page", seconds)
+        PAGES_SCRAPED.inc(engine=self.engine)
+        BIDS_SCRAPED.inc(bids, engine=self.engine)
+        with self._lock:
+            self._pages.append({"page": page_num, "state": state, "ms": round(seconds * 1000, 1), "bids": bids})
+
+    def summary(self):
+        with self._lock:
+            phases = {
+                phase: {"count": count, "total_ms": round(total * 1000, 1), "max_ms": round(longest * 1000, 1)}
+                for phase, (count, total, longest) in self._phases.items()
+            }
+            pages = list(self._pages)
+        return {
+            "total_ms": round((time.monotonic() - self.started) * 1000, 1),
+            "phases": phases,
+            "pages": pages,
+        }
+
+
+def span(timings, phase):
+    """``timings.span(phase)``, or a no-op when there is nothing to record into."""
+    return timings.span(phase) if timings is not None else nullcontext()
@@ -3,6 +3,8 @@ import axios from 'axios';
 import Papa from 'papaparse';
 import './App.css';
 
+const JOB_POLL_INTERVAL_MS = 2000;
+
 function App() {
     const [url, setUrl] = useState('https://bidplus.gem.gov.in/advance-search');
     const [startDate, setStartDate] = useState(new Date(new Date().setDate(new Date().getDate() - 2)).toISOString().split('T')[0]);
@@ -11,6 +13,8 @@ function App() {
     const [bids, setBids] = useState([]);
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState('');
+    const [progress, setProgress] = useState('');
+    const [incomplete, setIncomplete] = useState(null);
     const [healthStatus, setHealthStatus] = useState('');
     const [backendUrl, setBackendUrl] = useState(localStorage.getItem('backendUrl') || '');
 
@@ -19,44 +23,61 @@ function App() {
         localStorage.setItem('backendUrl', backendUrl);
     }, [backendUrl]);
 
-    const handleScrape = async () => {
+    // `request` is the job payload; a resumed scrape sends just its resumeToken.
+    const handleScrape = async (request) => {
         setLoading(true);
         setError('');
         setBids([]);
+        setProgress('');
+        setIncomplete(null);
 
         try {
-            const response = await axios.post(`${backendUrl}/scrape`, {
+            // Queue the scrape as a background job, then poll it for progress.
+            const submitResponse = await axios.post(`${backendUrl}/jobs`, request || {
                 url,
                 startDate,
                 endDate,
                 state, // Add selected state to the request
             }, {
-                timeout: 900000, // 5 minutes timeout
+                timeout: 30000,
                 headers: {
                     'Content-Type': 'application/json'
-                },
-                onUploadProgress: (progressEvent) => {
-                    // Optional: Add progress tracking if needed
-                    const progress = Math.round((progressEvent.loaded * 100) / progressEvent.total);
-                    console.log(`Upload Progress: ${progress}%`);
-                },
-                onDownloadProgress: (progressEvent) => {
-                    // Optional: Add progress tracking if needed
-                    const progress = progressEvent.loaded ? Math.round((progressEvent.loaded * 100) / progressEvent.total) : 0;
-                    console.log(`Download Progress: ${progress}%`);
                 }
             });
-            
-            if (response.data.error) {
-                throw new Error(response.data.details || response.data.error);
+            const { jobId } = submitResponse.data;
+            let collected = [];
+            let job;
+
+            do {
+                await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+                const statusResponse = await axios.get(`${backendUrl}/jobs/${jobId}`, {
+                    params: { since: collected.length },
+                    timeout: 30000
+                });
+                job = statusResponse.data;
+                if (job.data && job.data.length > 0) {
+                    collected = collected.concat(job.data);
+                    setBids(collected);
+                }
+                setProgress(`${job.status}: ${job.pagesDone} page(s) scraped, ${job.bidsSoFar} bid(s) found`);
+            } while (job.status === 'queued' || job.status === 'running');
+
+            if (job.status === 'failed') {
+                throw new Error(job.error || 'Scraping failed');
             }
-            
-            // The backend now returns data in response.data.data
-            setBids(response.data.data || []);
-            
-            // Show a success message if no bids were found
-            if (response.data.message && response.data.message.includes('No bids')) {
-                setError(response.data.message);
+
+            // The portal kept failing midway: the bids so far are shown, and the rest can be resumed.
+            if (job.report && job.report.incomplete) {
+                setIncomplete({
+                    error: job.report.error,
+                    resumeToken: job.report.resume_token,
+                });
+                return;
+            }
+
+            // Show a message if no bids were found
+            if (collected.length === 0) {
+                setError('No bids found for the given criteria');
             }
         } catch (err) {
             let errorMessage = 'Failed to scrape data. ';
@@ -163,7 +184,7 @@ function App() {
                         </div>
                     </div>
                     <div className="button-group">
-                        <button onClick={handleScrape} disabled={loading || !backendUrl}>
+                        <button onClick={() => handleScrape()} disabled={loading || !backendUrl}>
                             {loading ? 'Scraping...' : 'Scrape Bids'}
                         </button>
                         <button onClick={handleHealthCheck} className="health-btn" disabled={!backendUrl}>
@@ -178,7 +199,29 @@ function App() {
                     )}
                 </div>
 
+                {loading && progress && <p className="progress">{progress}</p>}
                 {error && <p className="error">{error}</p>}
+                {incomplete && (
+                    <div className="warning">
+                        <p>
+                            Partial results: the GeM portal kept failing midway
+                            {incomplete.error && ` (${incomplete.error})`}.
+                        </p>
+                        {incomplete.resumeToken ? (
+                            <p>
+                                Resume token: <code>{incomplete.resumeToken}</code>{' '}
+                                <button
+                                    onClick={() => handleScrape({ resumeToken: incomplete.resumeToken })}
+                                    disabled={loading || !backendUrl}
+                                >
+                                    Resume Scrape
+                                </button>
+                            </p>
+                        ) : (
+                            <p>This scrape cannot be resumed; run it again to get the remaining bids.</p>
+                        )}
+                    </div>
+                )}
 
                 {bids.length > 0 && (
                      <div className="results">